@@ -0,0 +1,389 @@
+"""
+Transaction Aggregation Module
+
+Sums transaction amounts in USD with SQL aggregates instead of loading every
+transaction row.
+
+Rows are grouped by currency and recipient JSON rate in the database, and each
+group total is converted once, exactly as convert_to_usd would. Conversion is
+linear in the amount for a fixed currency and rate, so this matches converting
+row by row while keeping the JSON rate sanity check in one place.
+"""
+
+import threading
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Query
+from app.models import TransactionCache
+from app.currency_rates import usd_converter
+
+_ZERO = Decimal(0)
+
+ERROR_STATUSES = ("failed", "declined", "reversed")
+
+# Recipient JSON rate as text (None when absent), parsed by parse_json_rate
+JSON_RATE = TransactionCache.recipient['rate'].as_string().label('json_rate')
+
+_IS_SUCCESS = TransactionCache.status == "success"
+_IS_ERROR = TransactionCache.status.in_(ERROR_STATUSES)
+
+# Missing or empty currency codes count as USD, like convert_to_usd does
+CURRENCY = func.coalesce(func.nullif(TransactionCache.currency, ''), 'USD').label('currency')
+
+
+class UsdTotals(NamedTuple):
+    """Aggregated totals for a group of transactions"""
+    count: int
+    volume: Decimal        # sum of human_readable_amount in the original currency
+    volume_usd: Decimal
+    revenue_usd: Decimal
+
+
+EMPTY_TOTALS = UsdTotals(0, _ZERO, _ZERO, _ZERO)
+
+
+class PeriodTotals(NamedTuple):
+    """Status counts plus successful transaction totals for a period"""
+    total_count: int
+    error_count: int       # failed, declined and reversed
+    success: UsdTotals
+
+
+EMPTY_PERIOD = PeriodTotals(0, 0, EMPTY_TOTALS)
+
+
+def parse_json_rate(value: Any) -> Optional[Decimal]:
+    """
+    Parse a rate extracted from recipient JSON.
+
+    Returns None for missing, empty or non-numeric rates, so they fall back
+    to the predefined rates.
+    """
+    if not value:
+        return None
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+class UsdConverters(dict):
+    """
+    USD converters keyed by (currency, raw JSON rate), resolved on first use.
+    
+    For loops that must convert row by row: each distinct pair is parsed and
+    checked once, and every row after that is a single multiply or divide.
+    Use one instance per request so rate table refreshes are picked up.
+    """
+    
+    def __missing__(self, key: Tuple[str, Any]) -> Callable[[Decimal], Decimal]:
+        currency, raw_rate = key
+        convert = self[key] = usd_converter(currency, parse_json_rate(raw_rate))
+        return convert
+
+
+def usd_totals_by(query: Query, keys: Sequence[Any] = ()) -> Dict[Tuple, UsdTotals]:
+    """
+    Aggregate the transactions selected by a query, grouped by key columns.
+
+    Args:
+        query: Filtered TransactionCache query (its selected columns are replaced)
+        keys: Column expressions to group by (may be empty)
+
+    Returns:
+        Dictionary mapping each tuple of key values to its UsdTotals
+    """
+    rows = query.with_entities(
+        *keys,
+        CURRENCY,
+        JSON_RATE,
+        func.count(TransactionCache.id),
+        func.sum(TransactionCache.human_readable_amount),
+        func.sum(TransactionCache.human_readable_charge)
+    ).group_by(*keys, CURRENCY, JSON_RATE).all()
+
+    width = len(keys)
+    totals: Dict[Tuple, list] = {}
+
+    for row in rows:
+        key = tuple(row[:width])
+        currency, raw_rate, count, amount, charge = row[width:]
+        amount = amount or _ZERO
+        to_usd = usd_converter(currency, parse_json_rate(raw_rate))
+
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = [0, _ZERO, _ZERO, _ZERO]
+
+        entry[0] += count
+        entry[1] += amount
+        entry[2] += to_usd(amount)
+        entry[3] += to_usd(charge)
+
+    return {key: UsdTotals(*entry) for key, entry in totals.items()}
+
+
+def usd_totals(query: Query) -> UsdTotals:
+    """Aggregate all transactions selected by a query into a single UsdTotals."""
+    return usd_totals_by(query).get((), EMPTY_TOTALS)
+
+
+def period_totals_by(query: Query, keys: Sequence[Any] = ()) -> Dict[Tuple, PeriodTotals]:
+    """
+    Aggregate status counts and successful transaction totals in one query,
+    grouped by key columns.
+
+    Args:
+        query: Filtered TransactionCache query (its selected columns are replaced)
+        keys: Column expressions to group by (may be empty)
+
+    Returns:
+        Dictionary mapping each tuple of key values to its PeriodTotals
+    """
+    rows = query.with_entities(
+        *keys,
+        CURRENCY,
+        JSON_RATE,
+        func.count(TransactionCache.id),
+        func.sum(case((_IS_ERROR, 1), else_=0)),
+        func.sum(case((_IS_SUCCESS, 1), else_=0)),
+        func.sum(case((_IS_SUCCESS, TransactionCache.human_readable_amount))),
+        func.sum(case((_IS_SUCCESS, TransactionCache.human_readable_charge)))
+    ).group_by(*keys, CURRENCY, JSON_RATE).all()
+
+    width = len(keys)
+    totals: Dict[Tuple, list] = {}
+
+    for row in rows:
+        key = tuple(row[:width])
+        currency, raw_rate, total_count, error_count, success_count, amount, charge = row[width:]
+        amount = amount or _ZERO
+        to_usd = usd_converter(currency, parse_json_rate(raw_rate))
+
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = [0, 0, 0, _ZERO, _ZERO, _ZERO]
+
+        entry[0] += total_count
+        entry[1] += int(error_count or 0)
+        entry[2] += int(success_count or 0)
+        entry[3] += amount
+        entry[4] += to_usd(amount)
+        entry[5] += to_usd(charge)
+
+    return {
+        key: PeriodTotals(total_count, error_count, UsdTotals(*success))
+        for key, (total_count, error_count, *success) in totals.items()
+    }
+
+
+def period_totals(query: Query) -> PeriodTotals:
+    """Aggregate all transactions selected by a query into a single PeriodTotals."""
+    return period_totals_by(query).get((), EMPTY_PERIOD)
+
+
+def merge_totals(items: Iterable[PeriodTotals]) -> PeriodTotals:
+    """Add up PeriodTotals, e.g. the days of a period."""
+    total_count = error_count = count = 0
+    volume = volume_usd = revenue_usd = _ZERO
+    for item in items:
+        total_count += item.total_count
+        error_count += item.error_count
+        count += item.success.count
+        volume += item.success.volume
+        volume_usd += item.success.volume_usd
+        revenue_usd += item.success.revenue_usd
+    return PeriodTotals(total_count, error_count, UsdTotals(count, volume, volume_usd, revenue_usd))
+
+
+def _as_date(value: Any) -> date:
+    # MySQL returns DATE() as a date, SQLite as an ISO string
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def daily_totals(query: Query) -> Dict[date, PeriodTotals]:
+    """
+    Aggregate the transactions selected by a query into PeriodTotals per day.
+
+    Args:
+        query: Filtered TransactionCache query
+
+    Returns:
+        Dictionary mapping each day with transactions to its PeriodTotals
+    """
+    day = func.date(TransactionCache.created_at)
+    return {
+        _as_date(day_value): totals
+        for (day_value,), totals in period_totals_by(query, (day,)).items()
+    }
+
+
+def daily_status_totals(query: Query) -> Dict[Tuple[date, Optional[str]], UsdTotals]:
+    """
+    Aggregate the transactions selected by a query into UsdTotals per day and status.
+    
+    Args:
+        query: Filtered TransactionCache query
+    
+    Returns:
+        Dictionary mapping each (day, status) pair with transactions to its UsdTotals
+    """
+    day = func.date(TransactionCache.created_at)
+    return {
+        (_as_date(day_value), status): totals
+        for (day_value, status), totals in usd_totals_by(query, (day, TransactionCache.status)).items()
+    }
+
+
+class DailyRollup:
+    """
+    Per-day totals kept in memory.
+    
+    Stands in for a materialized view: transactions only change when the
+    transaction sync writes them, so day totals are aggregated once and reused
+    until invalidate() is called (the sync does this after each write) or they
+    are older than max_age. Today's totals expire sooner (today_max_age) in
+    case rows are written by something other than the sync.
+    
+    Totals aggregated while invalidate() runs are returned but not stored,
+    since the query may have read rows from before the sync's write.
+    """
+    
+    def __init__(self, max_age: timedelta = timedelta(minutes=30),
+                 today_max_age: timedelta = timedelta(minutes=5)):
+        self.max_age = max_age
+        self.today_max_age = today_max_age
+        self._lock = threading.Lock()
+        self._days: Dict[date, PeriodTotals] = {}
+        self._first_day: Optional[date] = None
+        self._until: Optional[date] = None      # days before this one are loaded
+        self._refreshed_at: Optional[datetime] = None
+        self._current: Dict[date, PeriodTotals] = {}
+        self._current_from: Optional[date] = None   # today and later days are loaded
+        self._current_at: Optional[datetime] = None
+        self._generation = 0    # bumped by invalidate()
+    
+    def invalidate(self) -> None:
+        """Drop the cached days so the next read aggregates them again."""
+        with self._lock:
+            self._generation += 1
+            self._days = {}
+            self._first_day = self._until = self._refreshed_at = None
+            self._current = {}
+            self._current_from = self._current_at = None
+    
+    def _past_fresh(self, first_day: date, today: date, now: datetime) -> bool:
+        return (
+            self._refreshed_at is not None
+            and now - self._refreshed_at < self.max_age
+            and self._until == today
+            and self._first_day <= first_day
+        )
+    
+    def _current_fresh(self, today: date, now: datetime) -> bool:
+        return (
+            self._current_at is not None
+            and now - self._current_at < self.today_max_age
+            and self._current_from == today
+        )
+    
+    def _past_days(self, db, first_day: date, today: date, now: datetime) -> Tuple[Dict[date, PeriodTotals], datetime]:
+        with self._lock:
+            if self._past_fresh(first_day, today, now):
+                return self._days, self._refreshed_at
+            generation = self._generation
+        
+        days = daily_totals(db.query(TransactionCache).filter(
+            TransactionCache.created_at >= datetime.combine(first_day, time.min),
+            TransactionCache.created_at < datetime.combine(today, time.min)
+        ))
+        
+        with self._lock:
+            if self._generation == generation:
+                self._days, self._first_day, self._until, self._refreshed_at = days, first_day, today, now
+        return days, now
+    
+    def _current_days(self, db, today: date, now: datetime) -> Tuple[Dict[date, PeriodTotals], datetime]:
+        with self._lock:
+            if self._current_fresh(today, now):
+                return self._current, self._current_at
+            generation = self._generation
+        
+        days = daily_totals(db.query(TransactionCache).filter(
+            TransactionCache.created_at >= datetime.combine(today, time.min)
+        ))
+        
+        with self._lock:
+            if self._generation == generation:
+                self._current, self._current_from, self._current_at = days, today, now
+        return days, now
+    
+    def _load_all(self, db, first_day: date, today: date, now: datetime) -> None:
+        # Both caches are stale: fill them from a single query
+        with self._lock:
+            generation = self._generation
+        days = daily_totals(db.query(TransactionCache).filter(
+            TransactionCache.created_at >= datetime.combine(first_day, time.min)
+        ))
+        past = {day: totals for day, totals in days.items() if day < today}
+        current = {day: totals for day, totals in days.items() if day >= today}
+        
+        with self._lock:
+            if self._generation != generation:
+                return
+            self._days, self._first_day, self._until, self._refreshed_at = past, first_day, today, now
+            self._current, self._current_from, self._current_at = current, today, now
+    
+    def today(self, db) -> Tuple[PeriodTotals, float]:
+        """
+        Totals for transactions created since midnight.
+        
+        Returns:
+            Tuple of (totals, age in seconds of the cached totals)
+        """
+        now = datetime.now()
+        current, refreshed_at = self._current_days(db, now.date(), now)
+        return merge_totals(current.values()), (now - refreshed_at).total_seconds()
+    
+    def periods(self, db, ranges: Dict[str, Tuple[datetime, datetime]]) -> Tuple[Dict[str, PeriodTotals], float]:
+        """
+        Totals for several day-aligned (start, end) ranges, with end inclusive.
+        
+        Returns:
+            Tuple of (totals per range key, age in seconds of the oldest day totals used)
+        """
+        now = datetime.now()
+        today = now.date()
+        first_day = min(start for start, _ in ranges.values()).date()
+        last_day = max(end for _, end in ranges.values()).date()
+        
+        if first_day < today <= last_day:
+            with self._lock:
+                stale = not self._past_fresh(first_day, today, now) and not self._current_fresh(today, now)
+            if stale:
+                self._load_all(db, first_day, today, now)
+        
+        days: Dict[date, PeriodTotals] = {}
+        staleness = 0.0
+        if first_day < today:
+            past, refreshed_at = self._past_days(db, first_day, today, now)
+            days.update(past)
+            staleness = (now - refreshed_at).total_seconds()
+        if last_day >= today:
+            current, refreshed_at = self._current_days(db, today, now)
+            days.update(current)
+            staleness = max(staleness, (now - refreshed_at).total_seconds())
+        
+        totals = {
+            key: merge_totals(
+                day_totals for day, day_totals in days.items()
+                if start.date() <= day <= end.date()
+            )
+            for key, (start, end) in ranges.items()
+        }
+        return totals, staleness
+
+
+daily_rollup = DailyRollup()
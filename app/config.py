@@ -1,26 +1,66 @@
-from pydantic_settings import BaseSettings
-from pydantic import ConfigDict, Field
-from typing import Optional
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+from functools import lru_cache
+from dotenv import dotenv_values
 
-class Settings(BaseSettings):
+# .env is parsed once at import; real environment variables take precedence over it
+_DOTENV_VALUES = {key: value for key, value in dotenv_values(".env").items() if value is not None}
+
+def _require(env: Mapping[str, str], name: str) -> str:
+    """Read a required setting"""
+    value = env.get(name)
+    if not value:
+        raise ValueError(f"Missing required setting {name}. Set it in the environment or in .env")
+    return value
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     database_url: str
+
+    # Transaction Sync Configuration
+    global_transaction_api_key: str
+
     api_host: str = "0.0.0.0"
     api_port: int = 8000
-    
+
     # Weekly Email Report Configuration (Gmail API)
     weekly_report_sender_email: Optional[str] = None
-    gmail_client_id: Optional[str] = Field(default=None, alias="GMAIL_CLIENT_ID")
-    gmail_client_secret: Optional[str] = Field(default=None, alias="GMAIL_CLIENT_SECRET")
-    gmail_refresh_token: Optional[str] = Field(default=None, alias="GMAIL_REFRESH_TOKEN")
-    gmail_sender_email: Optional[str] = Field(default=None, alias="GMAIL_SENDER_EMAIL")
-    
-    # Transaction Sync Configuration
-    global_transaction_api_key: str = Field(..., alias="GLOBAL_TRANSACTION_API_KEY")
-    
+    gmail_client_id: Optional[str] = None
+    gmail_client_secret: Optional[str] = None
+    gmail_refresh_token: Optional[str] = None
+    gmail_sender_email: Optional[str] = None
+
     # Branding Configuration
     company_name: str = "SpennX"
     company_logo_url: Optional[str] = None  # Set in .env if you have a logo URL
-    
-    model_config = ConfigDict(env_file=".env", extra="ignore", populate_by_name=True)
 
-settings = Settings()
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        """Build settings from environment variables, falling back to values in .env"""
+        values = {**_DOTENV_VALUES, **(os.environ if environ is None else environ)}
+        env = values.get
+        return cls(
+            database_url=_require(values, "DATABASE_URL"),
+            global_transaction_api_key=_require(values, "GLOBAL_TRANSACTION_API_KEY"),
+            api_host=env("API_HOST", "0.0.0.0"),
+            api_port=int(env("API_PORT", "8000")),
+            weekly_report_sender_email=env("WEEKLY_REPORT_SENDER_EMAIL"),
+            gmail_client_id=env("GMAIL_CLIENT_ID"),
+            gmail_client_secret=env("GMAIL_CLIENT_SECRET"),
+            gmail_refresh_token=env("GMAIL_REFRESH_TOKEN"),
+            gmail_sender_email=env("GMAIL_SENDER_EMAIL"),
+            company_name=env("COMPANY_NAME", "SpennX"),
+            company_logo_url=env("COMPANY_LOGO_URL"),
+        )
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings on first use and reuse them afterwards"""
+    return Settings.from_env()
+
+def __getattr__(name: str):
+    # Keep `from app.config import settings` working without building Settings at import
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
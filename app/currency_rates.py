@@ -1,10 +1,12 @@
-from decimal import Decimal
-from typing import Dict
+from decimal import Context, Decimal, ROUND_HALF_EVEN
+from functools import partial
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
 
 # Current exchange rates from spennx.com (1 USD = X currency)
 # These rates will be used as fallback if rate is not in recipient JSON
-# Later these can be loaded from a database table
-CURRENCY_RATES: Dict[str, Decimal] = {
+# and can be refreshed from the database with update_rates_from_db()
+_DEFAULT_RATES: Dict[str, Decimal] = {
     "USD": Decimal("1.0"),
     "NGN": Decimal("1433.6190917516"),
     "KES": Decimal("125.30281513658"),
@@ -20,6 +22,91 @@ CURRENCY_RATES: Dict[str, Decimal] = {
     "XAF": Decimal("571.1219951195"),
 }
 
+_ZERO = Decimal("0")
+_ONE = Decimal("1.0")
+_HALF = Decimal("0.5")
+_TEN = Decimal(10)
+
+# Shared context for conversion arithmetic. 18 significant digits covers the
+# Numeric(15, 2) amount columns with room to spare, and calling its methods
+# directly skips the thread-local getcontext() lookup on every operation.
+_CTX = Context(prec=18, rounding=ROUND_HALF_EVEN)
+_mul = _CTX.multiply
+_div = _CTX.divide
+
+# Fixed-point scale for integer rates (10 decimal places, matching the DB column)
+_RATE_SCALE = 10 ** 10
+
+# ISO 4217 minor-unit exponents that differ from USD's 2 (e.g. UGX has no cents)
+_MINOR_UNIT_EXPONENTS: Dict[str, int] = {
+    "RWF": 0,
+    "UGX": 0,
+    "XAF": 0,
+}
+
+
+class _RateTables(NamedTuple):
+    """Read-only rate table plus everything precomputed from it"""
+    rates: Mapping[str, Decimal]       # 1 USD = X currency
+    usd_rates: Mapping[str, Decimal]   # 1 currency = Y USD
+    rates_scaled: Mapping[str, int]    # rates * _RATE_SCALE for integer minor-unit math
+    entries: Mapping[str, Tuple[Decimal, Decimal]]  # (rate, usd_rate) per code in one probe
+    converters: Mapping[str, Callable[[Decimal], Decimal]]  # amount -> USD at the table rate
+
+
+class _RatesStore:
+    """
+    Holds the current rate tables.
+    
+    update() builds a complete new set of tables and publishes it with a
+    single attribute assignment, so readers never see a half-updated set and
+    never need a lock.
+    """
+    
+    def __init__(self, rates: Mapping[str, Decimal]):
+        self.tables = self._build(rates)
+    
+    @staticmethod
+    def _build(rates: Mapping[str, Decimal]) -> _RateTables:
+        rates = {code.upper(): Decimal(rate) for code, rate in rates.items()}
+        rates["USD"] = _ONE
+        usd_rates = {
+            code: (_ONE if code == "USD" else _ONE / rate)
+            for code, rate in rates.items()
+        }
+        return _RateTables(
+            rates=MappingProxyType(rates),
+            usd_rates=MappingProxyType(usd_rates),
+            rates_scaled=MappingProxyType({code: int(rate * _RATE_SCALE) for code, rate in rates.items()}),
+            entries=MappingProxyType({code: (rate, usd_rates[code]) for code, rate in rates.items()}),
+            converters=MappingProxyType({
+                code: partial(_mul, usd_rate) for code, usd_rate in usd_rates.items()
+            }),
+        )
+    
+    def update(self, rates: Mapping[str, Decimal]) -> None:
+        self.tables = self._build(rates)
+
+
+_store = _RatesStore(_DEFAULT_RATES)
+
+_TABLE_ATTRS = {
+    "CURRENCY_RATES": "rates",
+    "USD_RATES": "usd_rates",
+}
+
+def __getattr__(name: str):
+    # Module-level table names always resolve to the current snapshot
+    if name in _TABLE_ATTRS:
+        return getattr(_store.tables, _TABLE_ATTRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _normalize_code(currency_code: str) -> str:
+    """Upper-case a currency code, skipping the copy when it already is (DB values usually are)."""
+    if not currency_code:
+        return "USD"
+    return currency_code if currency_code.isupper() else currency_code.upper()
+
 def get_usd_rate(currency_code: str) -> Decimal:
     """
     Get the exchange rate to convert from currency to USD.
@@ -31,19 +118,9 @@ def get_usd_rate(currency_code: str) -> Decimal:
     - So rate_to_usd = 1 / 1433.62
     """
     if not currency_code:
-        return Decimal("1.0")
-    
-    currency_code = currency_code.upper()
-    
-    if currency_code == "USD":
-        return Decimal("1.0")
-    
-    if currency_code in CURRENCY_RATES:
-        # Convert "1 USD = X currency" to "1 currency = Y USD"
-        return Decimal("1.0") / CURRENCY_RATES[currency_code]
-    
-    # If currency not found, assume 1:1 (will need to be updated)
-    return Decimal("1.0")
+        return _ONE
+    # One lookup in the current snapshot; if currency not found, assume 1:1 (will need to be updated)
+    return _store.tables.usd_rates.get(_normalize_code(currency_code), _ONE)
 
 def convert_to_usd(amount: Decimal, currency_code: str, rate_from_json: Decimal = None) -> Decimal:
     """
@@ -63,66 +140,142 @@ def convert_to_usd(amount: Decimal, currency_code: str, rate_from_json: Decimal
         Amount in USD
     """
     if not amount:
-        return Decimal("0")
-    
-    currency_code = currency_code.upper() if currency_code else "USD"
-    
+        return _ZERO
+    currency_code = _normalize_code(currency_code)
     # If using matching currency (USD to USD), result is amount
     if currency_code == "USD":
         return amount
+    return _convert_nonusd(amount, currency_code, rate_from_json)
 
-    # Determine if we should trust the JSON rate
-    use_json_rate = False
-    
+def _convert_nonusd(amount: Decimal, currency_code: str, rate_from_json: Optional[Decimal]) -> Decimal:
+    """Conversion body of convert_to_usd for a non-zero amount and a normalized, non-USD code."""
     if rate_from_json and rate_from_json > 0:
-        # If we know the currency, sanity check the JSON rate
-        if currency_code in CURRENCY_RATES:
-            known_rate = CURRENCY_RATES[currency_code] # 1 USD = X Currency
-            
-            # Check if JSON rate matches "1 USD = X Currency" format (e.g. 571 for XAF)
-            # Allow 50% deviation to account for market savings/fluctuations
-            if abs(rate_from_json - known_rate) < (known_rate * Decimal("0.5")):
-                use_json_rate = True
-                
-            # Check if JSON rate matches "1 Currency = Y USD" format (e.g. 0.0017 for XAF)
-            elif abs((Decimal("1.0")/rate_from_json) - known_rate) < (known_rate * Decimal("0.5")):
-                use_json_rate = True
-                
-            # If it matches neither (like the 2.515 case aka 7545 USD error), ignore it
-            # and fall back to known rates
-        else:
-            # If currency unknown, we have to trust the JSON rate
-            use_json_rate = True
-
-    if use_json_rate:
-        # Check if the JSON rate is "currency to USD" or "USD to currency"
-        # If it's a large number (>10), it's likely "1 USD = X currency" (except for Japanese Yen etc, but generic rule)
-        # Better heuristic: Compare with 1.0. 
-        # Most african/global currencies designated here are > 1 per USD (NGN, XAF, KES)
-        # Currencies < 1 per USD are GBP, EUR, KWD.
-        
-        if rate_from_json > 10:
-             # Assume 1 USD = rate * Currency -> USD = Amount / rate
-            return amount / rate_from_json
-        else:
-            # Assume 1 Currency = rate * USD -> USD = Amount * rate
-            return amount * rate_from_json
+        divide = _json_rate_divides(currency_code, rate_from_json)
+        if divide:
+            return _div(amount, rate_from_json)
+        if divide is False:
+            return _mul(amount, rate_from_json)
     
     # Otherwise use our predefined rates
-    usd_rate = get_usd_rate(currency_code)
-    return amount * usd_rate
+    converter = _store.tables.converters.get(currency_code)
+    
+    # If currency not found, assume 1:1 (will need to be updated)
+    return converter(amount) if converter else amount
 
-# Function to update rates from database (to be implemented later)
-def update_rates_from_db(db_session):
+def _json_rate_divides(currency_code: str, rate_from_json: Decimal) -> Optional[bool]:
     """
-    Update CURRENCY_RATES from database table.
-    This will be implemented when you create the rates table.
+    Decide how a positive JSON rate applies to a normalized, non-USD code.
     
-    Example table structure:
+    Returns True to divide by it, False to multiply by it, or None to ignore
+    it and use the predefined rate.
+    """
+    entry = _store.tables.entries.get(currency_code)
+    
+    # If currency unknown, we have to trust the JSON rate
+    if entry is None:
+        # If it's a large number (>10), it's likely "1 USD = X currency"
+        # (except for Japanese Yen etc, but generic rule)
+        return rate_from_json > _TEN
+    
+    # known_rate: 1 USD = X Currency, usd_rate: 1 Currency = Y USD
+    known_rate, usd_rate = entry
+    
+    # Relative deviation of the JSON rate from each format:
+    # "1 USD = X Currency" (e.g. 571 for XAF) and "1 Currency = Y USD" (e.g. 0.0017 for XAF).
+    # The closer format decides the direction of the conversion, so rates below 10
+    # in "1 USD = X" form (EUR, GBP, CAD...) are divided rather than multiplied.
+    usd_to_currency_dev = _mul(abs(rate_from_json - known_rate), usd_rate)
+    currency_to_usd_dev = _mul(abs(rate_from_json - usd_rate), known_rate)
+    
+    # Allow 50% deviation to account for market savings/fluctuations.
+    # If it matches neither (like the 2.515 case aka 7545 USD error), ignore it
+    # and fall back to known rates
+    if usd_to_currency_dev <= currency_to_usd_dev:
+        return True if usd_to_currency_dev < _HALF else None
+    return False if currency_to_usd_dev < _HALF else None
+
+def usd_converter(currency_code: str, rate_from_json: Optional[Decimal] = None) -> Callable[[Decimal], Decimal]:
+    """
+    Resolve the conversion convert_to_usd would apply for a currency and JSON rate.
+    
+    The choice of rate does not depend on the amount, so loops over many rows
+    can resolve it once per distinct (currency, rate) pair and then convert
+    each amount with a single multiply or divide. Converters capture the rate
+    tables at the time of the call.
+    
+    Returns:
+        Function mapping an amount in the original currency to USD
+    """
+    currency_code = _normalize_code(currency_code)
+    
+    if currency_code == "USD":
+        return _identity
+    
+    if rate_from_json and rate_from_json > 0:
+        divide = _json_rate_divides(currency_code, rate_from_json)
+        if divide:
+            return lambda amount: _div(amount, rate_from_json) if amount else _ZERO
+        if divide is False:
+            return lambda amount: _mul(amount, rate_from_json) if amount else _ZERO
+    
+    converter = _store.tables.converters.get(currency_code)
+    if converter is None:
+        return _identity
+    return lambda amount: converter(amount) if amount else _ZERO
+
+def _identity(amount: Decimal) -> Decimal:
+    return amount if amount else _ZERO
+
+def convert_to_usd_cents(amount_minor: int, currency_code: str) -> int:
+    """
+    Convert an amount in minor units (e.g. the BigInteger amount/charge columns)
+    to USD cents using the predefined rates, with integer arithmetic only.
+    
+    Minor units follow ISO 4217, so zero-decimal currencies (UGX, RWF, XAF)
+    are whole units. Rounds half up.
+    
+    Example:
+    - 143361 kobo (1,433.61 NGN) -> 100 cents
+    - 3458 UGX -> 100 cents
+    """
+    if not amount_minor:
+        return 0
+    
+    currency_code = _normalize_code(currency_code)
+    scaled_rate = _store.tables.rates_scaled.get(currency_code)
+    
+    # Unknown currency (or USD): assume 1:1
+    if not scaled_rate or scaled_rate == _RATE_SCALE:
+        return amount_minor
+    
+    # amount / 10**exponent currency units, / rate USD, * 100 cents
+    numerator = amount_minor * _RATE_SCALE * 100
+    denominator = scaled_rate * 10 ** _MINOR_UNIT_EXPONENTS.get(currency_code, 2)
+    return (numerator + denominator // 2) // denominator
+
+def update_rates_from_db(db_session) -> int:
+    """
+    Refresh the rate tables from the currency_rates database table.
+    
+    Rows override the built-in defaults; currencies missing from the table
+    keep their default rate. The new tables replace the old ones in a single
+    swap, so concurrent conversions keep working during the refresh.
+    
+    Expected table structure (usd_rate is "1 USD = X currency"):
     CREATE TABLE currency_rates (
         currency_code VARCHAR(3) PRIMARY KEY,
         usd_rate DECIMAL(20, 10),
         updated_at TIMESTAMP
     );
+    
+    Returns:
+        Number of rates loaded from the database
     """
-    pass
+    from sqlalchemy import text
+    
+    rows = db_session.execute(
+        text("SELECT currency_code, usd_rate FROM currency_rates WHERE usd_rate > 0")
+    ).all()
+    
+    _store.update({**_DEFAULT_RATES, **{code: Decimal(rate) for code, rate in rows}})
+    return len(rows)
@@ -1,9 +1,13 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from app.config import settings
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from app.config import get_settings
 
-engine = create_engine(settings.database_url)
+engine = create_engine(get_settings().database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -13,3 +17,47 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def _connection_limit(pool) -> int:
+    # Connections a QueuePool hands out at once: pool_size plus max_overflow
+    if not isinstance(pool, QueuePool):
+        return 1
+    return pool.size() + max(pool._max_overflow, 0)
+
+# Threads for running requests' independent read queries side by side, one per
+# connection the engine can open; a request that can't get a free thread for
+# each of its queries runs them sequentially instead of queueing behind others
+_query_workers = _connection_limit(engine.pool)
+_query_executor = ThreadPoolExecutor(max_workers=_query_workers, thread_name_prefix="db-query")
+_query_slots = threading.BoundedSemaphore(_query_workers)
+
+def run_concurrently(db: Session, *queries: Callable[[Session], Any]) -> List[Any]:
+    """
+    Run independent read-only queries at the same time and return their results in order.
+    
+    Each query gets its own short-lived session on db's engine, so their round
+    trips overlap on separate pooled connections. Engines that don't pool real
+    connections (e.g. in-memory SQLite, which shares a single one) run the
+    queries one after another on db instead, as do requests arriving while
+    the query threads are busy with other requests.
+    """
+    bind = db.get_bind()
+    if not isinstance(bind.pool, QueuePool) or len(queries) < 2:
+        return [query(db) for query in queries]
+    
+    acquired = 0
+    while acquired < len(queries) and _query_slots.acquire(blocking=False):
+        acquired += 1
+    
+    try:
+        if acquired < len(queries):
+            return [query(db) for query in queries]
+        
+        def run(query):
+            with Session(bind) as session:
+                return query(session)
+        
+        return list(_query_executor.map(run, queries))
+    finally:
+        for _ in range(acquired):
+            _query_slots.release()
@@ -5,22 +5,82 @@ Handles email template generation and sending for weekly performance reports.
 Uses Gmail API for reliable email delivery.
 """
 
-from typing import Dict, Any, List
-from decimal import Decimal
-from datetime import datetime
+from typing import Dict, Any, List, Callable, Mapping, Optional, Tuple
+from datetime import date, datetime, timezone
 from app.gmail_service import send_gmail_message
-from app.config import settings
+from app.formatters import format_display
 import os
-import base64
+from pathlib import Path
+from string import Formatter
+from functools import lru_cache
 
 
+_PERIOD_START_FORMAT = "%b %d"
+_PERIOD_END_FORMAT = "%b %d, %Y"
+_GENERATED_AT_FORMAT = "%B %d, %Y at %H:%M UTC"
+
+# One line of the plain text currency distribution
+_TEXT_CURRENCY_LINE = "%d. %s - %s transactions, $%s (%.1f%%)"
+
+# Currency table striping: odd rows white, even rows light gray
+_ROW_COLORS = ("#FFFFFF", "#FAFBFC")
+
+
+def _compile_template(source: str) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Compile a str.format template into a render function.
+    
+    The template is parsed once: literal text is kept as ready-made fragments
+    and each replacement field becomes a (slot, name, key, format_spec) entry.
+    Rendering copies the fragment list, fills the field slots and joins it,
+    so no template parsing happens per email.
+    
+    Supports the subset the report templates use: `{name}`, `{name[key]}`
+    and an optional format spec.
+    """
+    parts: List[str] = []
+    fields = []
+    # Formatter.parse splits literal text at every escaped brace (the CSS is full
+    # of them); runs of literals are merged so the static <head>/<style> block and
+    # the closing markup each end up as a single prebuilt fragment
+    pending: List[str] = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(source):
+        pending.append(literal)
+        if field_name is None:
+            continue
+        if conversion:
+            raise ValueError(f"Conversions are not supported in templates: {field_name}!{conversion}")
+        if any(pending):
+            parts.append("".join(pending))
+        pending = []
+        name, _, key = field_name.partition("[")
+        fields.append((len(parts), name, key[:-1] if key else None, format_spec))
+        parts.append("")
+    if any(pending):
+        parts.append("".join(pending))
+    
+    def render(context: Mapping[str, Any]) -> str:
+        out = parts.copy()
+        for slot, name, key, format_spec in fields:
+            value = context[name]
+            if key is not None:
+                value = value[key]
+            out[slot] = format(value, format_spec)
+        return "".join(out)
+    
+    return render
+
+
+# HTML layout for the weekly report, compiled once at import
+_render_weekly_report = _compile_template(
+    (Path(__file__).parent / "templates" / "weekly_report.html").read_text(encoding="utf-8")
+)
+
+
+@lru_cache(maxsize=4096)
 def format_number(value: str) -> str:
-    """Format number with thousand separators"""
-    try:
-        num = Decimal(value)
-        return f"{num:,.2f}"
-    except:
-        return value
+    """Format number with thousand separators (cached: HTML and text renders share values)"""
+    return format_display(value)
 
 
 def get_change_indicator(change_pct: float) -> tuple[str, str]:
@@ -39,277 +99,118 @@ def get_change_indicator(change_pct: float) -> tuple[str, str]:
 
 
 
-def generate_html_email(report_data: Dict[str, Any]) -> str:
+def _precompute_fragments(current: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, str]:
     """
-    Generate HTML email from report data.
+    Render the sign prefixes, change figures, sentiment and headline amounts
+    shared by the HTML and plain text emails.
     
-    Args:
-        report_data: Complete report data structure
+    Every branch is evaluated once here, so the renderers only substitute strings.
+    """
+    volume_pct = changes["transaction_volume_change_pct"]
+    if volume_pct > 5:
+        sentiment_word, sentiment_color = "strong", "#10B981"
+    elif volume_pct > -5:
+        sentiment_word, sentiment_color = "stable", "#317CFF"
+    else:
+        sentiment_word, sentiment_color = "challenging", "#EF4444"
     
-    Returns:
-        HTML email content
+    return {
+        "vol_sign": "+" if volume_pct > 0 else "",
+        "vol_pct": f"{volume_pct:.1f}",
+        "vol_abs_sign": "+" if changes["transaction_volume_change_absolute"] > 0 else "",
+        "vol_abs": f"{changes['transaction_volume_change_absolute']:,}",
+        "success_rate_sign": "+" if changes["success_rate_change_pct"] > 0 else "",
+        "success_rate_pct": f"{changes['success_rate_change_pct']:.1f}",
+        "revenue_sign": "+" if changes["revenue_change_pct"] > 0 else "",
+        "revenue_pct": f"{changes['revenue_change_pct']:.1f}",
+        "revenue_abs": format_number(changes["revenue_change_absolute_usd"]),
+        "avg_size_sign": "+" if changes["avg_transaction_size_change_pct"] > 0 else "",
+        "avg_size_pct": f"{changes['avg_transaction_size_change_pct']:.1f}",
+        "sentiment_word": sentiment_word,
+        "sentiment_color": sentiment_color,
+        "total_volume": format_number(current["total_volume_usd"]),
+        "avg_transaction_size": format_number(current["avg_transaction_size_usd"]),
+        "total_revenue": format_number(current["total_revenue_usd"]),
+        "avg_fee_per_transaction": format_number(current["avg_fee_per_transaction_usd"]),
+    }
+
+
+def _generated_at() -> str:
+    """Footer timestamp for a report rendered now"""
+    return datetime.now(timezone.utc).strftime(_GENERATED_AT_FORMAT)
+
+
+def _report_context(report_data: Dict[str, Any], generated_at: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Do the setup shared by the HTML and plain text renderers once: date range,
+    precomputed fragments and the footer timestamp.
     """
     period = report_data["period"]
     current = report_data["current_week"]
     changes = report_data["week_over_week_changes"]
     
     # Format dates
-    start_date = datetime.strptime(period["start_date"], "%Y-%m-%d").strftime("%b %d")
-    end_date = datetime.strptime(period["end_date"], "%Y-%m-%d").strftime("%b %d, %Y")
-    date_range = f"{start_date} to {end_date}"
+    start_date = date.fromisoformat(period["start_date"]).strftime(_PERIOD_START_FORMAT)
+    end_date = date.fromisoformat(period["end_date"]).strftime(_PERIOD_END_FORMAT)
     
-    # Get branding info
-    company_name = settings.company_name
+    return {
+        "current": current,
+        "changes": changes,
+        "date_range": f"{start_date} to {end_date}",
+        "frag": _precompute_fragments(current, changes),
+        "generated_at": generated_at or _generated_at(),
+    }
+
+
+def generate_html_email(report_data: Dict[str, Any], generated_at: Optional[str] = None) -> str:
+    """
+    Generate HTML email from report data.
+    
+    Args:
+        report_data: Complete report data structure
+        generated_at: Footer timestamp (defaults to now)
+    
+    Returns:
+        HTML email content
+    """
+    return _render_html(_report_context(report_data, generated_at))
+
+
+def _render_html(ctx: Dict[str, Any]) -> str:
+    """Render the HTML email from a context built by _report_context"""
+    current = ctx["current"]
+    changes = ctx["changes"]
     
     # Get change indicators (Using text colors instead of arrows for cleaner look, or simple arrows)
     # We will stick to simple arrows but remove the emojis from the rest of the text
     
     # Build currency breakdown HTML
-    currency_rows = ""
-    for idx, currency_data in enumerate(current["currency_breakdown"], 1):
-        bg_color = "#FAFBFC" if idx % 2 == 0 else "#FFFFFF"
-        currency_rows += f"""
+    breakdown = current["currency_breakdown"]
+    row_parts = [""] * len(breakdown)
+    for i, currency_data in enumerate(breakdown):
+        bg_color = _ROW_COLORS[i & 1]
+        row_parts[i] = f"""
         <tr style="background-color: {bg_color};">
-            <td style="padding: 12px 16px; text-align: left; color: #1F2937; font-size: 14px; font-weight: 500; border-bottom: 1px solid #F3F4F6;">{currency_data['currency']}</td>
-            <td style="padding: 12px 16px; text-align: right; color: #4B5563; font-size: 14px; font-weight: 400; border-bottom: 1px solid #F3F4F6;">{currency_data['transaction_count']:,}</td>
-            <td style="padding: 12px 16px; text-align: right; color: #1F2937; font-size: 14px; font-weight: 600; border-bottom: 1px solid #F3F4F6;">${format_number(currency_data['volume_usd'])}</td>
-            <td style="padding: 12px 16px; text-align: right; color: #317CFF; font-size: 14px; font-weight: 600; border-bottom: 1px solid #F3F4F6;">{currency_data['percentage']:.1f}%</td>
+            <td class="cell cell-currency">{currency_data['currency']}</td>
+            <td class="cell cell-count">{currency_data['transaction_count']:,}</td>
+            <td class="cell">${format_number(currency_data['volume_usd'])}</td>
+            <td class="cell cell-share">{currency_data['percentage']:.1f}%</td>
         </tr>
         """
+    currency_rows = "".join(row_parts)
     
     # Generate insights based on data
     insights = generate_insights(current, changes)
-    insights_html = "".join([f"<li style='margin-bottom: 12px; color: #4B5563;'>{insight}</li>" for insight in insights])
-    
-    html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Weekly Transaction Performance Report</title>
-    <style>
-        @media only screen and (max-width: 600px) {{
-            .container {{
-                width: 100% !important;
-            }}
-            .metric-card {{
-                display: block !important;
-                width: 100% !important;
-                margin-bottom: 12px !important;
-            }}
-            .metric-table {{
-                font-size: 13px !important;
-            }}
-        }}
-    </style>
-</head>
-<body style="margin: 0; padding: 0; font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; background-color: #F3F4F6;">
-    <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #F3F4F6; padding: 40px 20px; font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;">
-        <tr>
-            <td align="center">
-                <table class="container" width="600" cellpadding="0" cellspacing="0" style="background-color: #FFFFFF; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
-                    
-
-
-                    <!-- Header with Gradient -->
-                    <tr>
-                        <td style="background: linear-gradient(135deg, #317CFF 0%, #1E5FD9 100%); padding: 32px 40px; text-align: center;">
-                            <h1 style="margin: 0; color: #FFFFFF; font-size: 24px; font-weight: 600; letter-spacing: 0.5px;">
-                                Weekly Performance Report
-                            </h1>
-                            <p style="margin: 8px 0 0 0; color: rgba(255,255,255,0.9); font-size: 15px; font-weight: 500;">
-                                {date_range}
-                            </p>
-                        </td>
-                    </tr>
-                    
-                    <!-- Content Area -->
-                    <tr>
-                        <td style="padding: 40px;">
-                            
-                            <!-- Greeting & Summary -->
-                            <p style="margin: 0 0 24px 0; color: #1F2937; font-size: 16px; line-height: 1.6;">
-                                Dear Team,
-                            </p>
-                            <p style="margin: 0 0 32px 0; color: #4B5563; font-size: 16px; line-height: 1.6;">
-                                Here is the transaction performance summary for <strong style="color: #1F2937;">{date_range}</strong>. 
-                                We observed <strong style="color: {'#10B981' if changes['transaction_volume_change_pct'] > 5 else '#317CFF' if changes['transaction_volume_change_pct'] > -5 else '#EF4444'};">{'strong' if changes['transaction_volume_change_pct'] > 5 else 'stable' if changes['transaction_volume_change_pct'] > -5 else 'challenging'}</strong> 
-                                performance across key metrics.
-                            </p>
-                            
-                            <!-- Core Metrics Section -->
-                            <h2 style="margin: 0 0 16px 0; color: #111827; font-size: 18px; font-weight: 700; border-bottom: 2px solid #E5E7EB; padding-bottom: 8px;">
-                                Performance Snapshot
-                            </h2>
-                            
-                            <!-- Transaction Volume -->
-                            <div style="background-color: #F9FAFB; border: 1px solid #E5E7EB; border-radius: 8px; padding: 20px; margin-bottom: 16px;">
-                                <h3 style="margin: 0 0 16px 0; color: #374151; font-size: 15px; font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px;">
-                                    Transaction Volume
-                                </h3>
-                                <table width="100%" cellpadding="0" cellspacing="0" class="metric-table">
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Total Transactions</td>
-                                        <td style="padding: 4px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right;">
-                                            {current['total_transactions']:,}
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Successful</td>
-                                        <td style="padding: 4px 0; color: #10B981; font-size: 15px; font-weight: 600; text-align: right;">
-                                            {current['success_count']:,} <span style="color: #6B7280; font-weight: 400; font-size: 13px;">({current['success_percentage']:.1f}%)</span>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Failed</td>
-                                        <td style="padding: 4px 0; color: #EF4444; font-size: 15px; font-weight: 600; text-align: right;">
-                                            {current['failed_count']:,} <span style="color: #6B7280; font-weight: 400; font-size: 13px;">({current['failed_percentage']:.1f}%)</span>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Pending</td>
-                                        <td style="padding: 4px 0; color: #F59E0B; font-size: 15px; font-weight: 600; text-align: right;">
-                                            {current['pending_count']:,} <span style="color: #6B7280; font-weight: 400; font-size: 13px;">({current['pending_percentage']:.1f}%)</span>
-                                        </td>
-                                    </tr>
-                                     <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Declined</td>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 15px; font-weight: 600; text-align: right;">
-                                            {current['declined_count']:,} <span style="color: #9CA3AF; font-weight: 400; font-size: 13px;">({current['declined_percentage']:.1f}%)</span>
-                                        </td>
-                                    </tr>
-                                </table>
-                            </div>
-                            
-                            <!-- Transaction Value -->
-                            <div style="background-color: #F9FAFB; border: 1px solid #E5E7EB; border-radius: 8px; padding: 20px; margin-bottom: 16px;">
-                                <h3 style="margin: 0 0 16px 0; color: #374151; font-size: 15px; font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px;">
-                                    Transaction Value
-                                </h3>
-                                <table width="100%" cellpadding="0" cellspacing="0" class="metric-table">
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Total Volume</td>
-                                        <td style="padding: 4px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right;">
-                                            ${format_number(current['total_volume_usd'])} 
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Average Transaction</td>
-                                        <td style="padding: 4px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right;">
-                                            ${format_number(current['avg_transaction_size_usd'])}
-                                        </td>
-                                    </tr>
-                                </table>
-                            </div>
-                            
-                            <!-- Revenue Performance -->
-                            <div style="background-color: #F9FAFB; border: 1px solid #E5E7EB; border-radius: 8px; padding: 20px; margin-bottom: 32px;">
-                                <h3 style="margin: 0 0 16px 0; color: #374151; font-size: 15px; font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px;">
-                                    Revenue Performance
-                                </h3>
-                                <table width="100%" cellpadding="0" cellspacing="0" class="metric-table">
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Total Fees Collected</td>
-                                        <td style="padding: 4px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right;">
-                                            ${format_number(current['total_revenue_usd'])} 
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Avg Fee per Txn</td>
-                                        <td style="padding: 4px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right;">
-                                            ${format_number(current['avg_fee_per_transaction_usd'])}
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 4px 0; color: #6B7280; font-size: 14px;">Fees-to-Value Ratio</td>
-                                        <td style="padding: 4px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right;">
-                                            {current['fees_to_value_ratio']:.2f}%
-                                        </td>
-                                    </tr>
-                                </table>
-                            </div>
-                            
-                            <!-- Currency Distribution -->
-                            <h2 style="margin: 0 0 16px 0; color: #111827; font-size: 18px; font-weight: 700; border-bottom: 2px solid #E5E7EB; padding-bottom: 8px;">
-                                Currency Distribution
-                            </h2>
-                            <table width="100%" cellpadding="0" cellspacing="0" style="border: 1px solid #E5E7EB; border-radius: 8px; overflow: hidden; margin-bottom: 32px;">
-                                <thead>
-                                    <tr style="background-color: #F9FAFB;">
-                                        <th style="padding: 12px 16px; text-align: left; color: #4B5563; font-size: 12px; font-weight: 600; text-transform: uppercase;">Currency</th>
-                                        <th style="padding: 12px 16px; text-align: right; color: #4B5563; font-size: 12px; font-weight: 600; text-transform: uppercase;">Txns</th>
-                                        <th style="padding: 12px 16px; text-align: right; color: #4B5563; font-size: 12px; font-weight: 600; text-transform: uppercase;">Volume</th>
-                                        <th style="padding: 12px 16px; text-align: right; color: #4B5563; font-size: 12px; font-weight: 600; text-transform: uppercase;">%</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-                                    {currency_rows}
-                                </tbody>
-                            </table>
-                            
-                            <!-- Week-over-Week Comparison -->
-                            <h2 style="margin: 0 0 16px 0; color: #111827; font-size: 18px; font-weight: 700; border-bottom: 2px solid #E5E7EB; padding-bottom: 8px;">
-                                Week-over-Week Comparison
-                            </h2>
-                            <div style="background-color: #F9FAFB; border: 1px solid #E5E7EB; border-radius: 8px; padding: 20px; margin-bottom: 32px;">
-                                <table width="100%" cellpadding="0" cellspacing="0">
-                                    <tr>
-                                        <td style="padding: 8px 0; color: #6B7280; font-size: 14px; border-bottom: 1px solid #E5E7EB;">Transaction Volume</td>
-                                        <td style="padding: 8px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right; border-bottom: 1px solid #E5E7EB;">
-                                            {'+' if changes['transaction_volume_change_pct'] > 0 else ''}{changes['transaction_volume_change_pct']:.1f}% 
-                                            <span style="color: #6B7280; font-size: 13px; font-weight: 400; margin-left: 4px;">({'+' if changes['transaction_volume_change_absolute'] > 0 else ''}{changes['transaction_volume_change_absolute']:,})</span>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 8px 0; color: #6B7280; font-size: 14px; border-bottom: 1px solid #E5E7EB;">Success Rate</td>
-                                        <td style="padding: 8px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right; border-bottom: 1px solid #E5E7EB;">
-                                            {'+' if changes['success_rate_change_pct'] > 0 else ''}{changes['success_rate_change_pct']:.1f} pts
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 8px 0; color: #6B7280; font-size: 14px; border-bottom: 1px solid #E5E7EB;">Revenue</td>
-                                        <td style="padding: 8px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right; border-bottom: 1px solid #E5E7EB;">
-                                            {'+' if changes['revenue_change_pct'] > 0 else ''}{changes['revenue_change_pct']:.1f}%
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 8px 0; color: #6B7280; font-size: 14px;">Avg Transaction Size</td>
-                                        <td style="padding: 8px 0; color: #111827; font-size: 15px; font-weight: 600; text-align: right;">
-                                            {'+' if changes['avg_transaction_size_change_pct'] > 0 else ''}{changes['avg_transaction_size_change_pct']:.1f}%
-                                        </td>
-                                    </tr>
-                                </table>
-                            </div>
-                            
-                            <!-- Key Insights -->
-                            <h2 style="margin: 0 0 16px 0; color: #111827; font-size: 18px; font-weight: 700; border-bottom: 2px solid #E5E7EB; padding-bottom: 8px;">
-                                Key Insights
-                            </h2>
-                            <ul style="margin: 0; padding-left: 20px; color: #4B5563; font-size: 15px; line-height: 1.6;">
-                                {insights_html}
-                            </ul>
-
-                        </td>
-                    </tr>
-                    
-                    <!-- Footer -->
-                    <tr>
-                        <td style="background-color: #F9FAFB; padding: 24px 30px; text-align: center; border-top: 1px solid #E5E7EB;">
-                            <p style="margin: 0; color: #6B7280; font-size: 12px; line-height: 1.6; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif;">
-                                <strong style="color: #1F2937; font-weight: 600;">SpennX Transaction Performance Report</strong><br>
-                                Generated on {datetime.now().strftime("%B %d, %Y at %H:%M UTC")}
-                            </p>
-                        </td>
-                    </tr>
-                    
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>
-    """
+    insights_html = "".join([f"<li class='insight'>{insight}</li>" for insight in insights])
+    
+    html = _render_weekly_report({
+        "date_range": ctx["date_range"],
+        "current": current,
+        "frag": ctx["frag"],
+        "currency_rows": currency_rows,
+        "insights_html": insights_html,
+        "generated_at": ctx["generated_at"],
+    })
     
     return html
 
@@ -326,37 +227,43 @@ def generate_insights(current: Dict[str, Any], changes: Dict[str, Any]) -> List[
         List of insight strings
     """
     insights = []
+    success_pct = current["success_percentage"]
     
-    # Success rate insight
-    if changes["success_rate_change_pct"] > 2:
+    # Success rate insight (magnitude computed once, reused for the "down" wording)
+    success_change = changes["success_rate_change_pct"]
+    success_change_abs = success_change if success_change >= 0 else -success_change
+    if success_change_abs <= 2:
         insights.append(
-            f"Success rate improved to {current['success_percentage']:.1f}%, "
-            f"up {changes['success_rate_change_pct']:.1f} percentage points from last week, "
-            f"reflecting enhanced payment gateway stability"
+            f"Success rate remained stable at {success_pct:.1f}%, "
+            f"demonstrating consistent platform reliability"
         )
-    elif changes["success_rate_change_pct"] < -2:
+    elif success_change > 0:
         insights.append(
-            f"Success rate decreased to {current['success_percentage']:.1f}%, "
-            f"down {abs(changes['success_rate_change_pct']):.1f} percentage points from last week, "
-            f"requiring attention to payment processing"
+            f"Success rate improved to {success_pct:.1f}%, "
+            f"up {success_change_abs:.1f} percentage points from last week, "
+            f"reflecting enhanced payment gateway stability"
         )
     else:
         insights.append(
-            f"Success rate remained stable at {current['success_percentage']:.1f}%, "
-            f"demonstrating consistent platform reliability"
+            f"Success rate decreased to {success_pct:.1f}%, "
+            f"down {success_change_abs:.1f} percentage points from last week, "
+            f"requiring attention to payment processing"
         )
     
     # Volume insight
-    if changes["transaction_volume_change_pct"] > 10:
-        insights.append(
-            f"Transaction volume surged by {changes['transaction_volume_change_pct']:.1f}%, "
-            f"indicating strong user engagement and platform growth"
-        )
-    elif changes["transaction_volume_change_pct"] < -10:
-        insights.append(
-            f"Transaction volume declined by {abs(changes['transaction_volume_change_pct']):.1f}%, "
-            f"suggesting need for user engagement initiatives"
-        )
+    volume_change = changes["transaction_volume_change_pct"]
+    volume_change_abs = volume_change if volume_change >= 0 else -volume_change
+    if volume_change_abs > 10:
+        if volume_change > 0:
+            insights.append(
+                f"Transaction volume surged by {volume_change_abs:.1f}%, "
+                f"indicating strong user engagement and platform growth"
+            )
+        else:
+            insights.append(
+                f"Transaction volume declined by {volume_change_abs:.1f}%, "
+                f"suggesting need for user engagement initiatives"
+            )
     
     # Revenue insight
     if changes["revenue_change_pct"] > 5:
@@ -366,13 +273,18 @@ def generate_insights(current: Dict[str, Any], changes: Dict[str, Any]) -> List[
         )
     
     # Currency insight
-    if current["currency_breakdown"]:
-        top_currency = current["currency_breakdown"][0]
+    breakdown = current["currency_breakdown"]
+    if breakdown:
+        top_currency = breakdown[0]
         insights.append(
             f"{top_currency['currency']} transactions continue to dominate, "
             f"representing {top_currency['percentage']:.1f}% of total volume"
         )
     
+    # Max 4 insights: once full, the remaining checks can't contribute
+    if len(insights) == 4:
+        return insights
+    
     # Failed transactions insight
     if current["failed_percentage"] > 5:
         insights.append(
@@ -380,27 +292,28 @@ def generate_insights(current: Dict[str, Any], changes: Dict[str, Any]) -> List[
             f"to improve overall platform performance"
         )
     
-    return insights[:4]  # Return max 4 insights
+    return insights
 
 
-def generate_plain_text_email(report_data: Dict[str, Any]) -> str:
+def generate_plain_text_email(report_data: Dict[str, Any], generated_at: Optional[str] = None) -> str:
     """
     Generate plain text email fallback.
     
     Args:
         report_data: Complete report data structure
+        generated_at: Footer timestamp (defaults to now)
     
     Returns:
         Plain text email content
     """
-    period = report_data["period"]
-    current = report_data["current_week"]
-    changes = report_data["week_over_week_changes"]
-    
-    # Format dates
-    start_date = datetime.strptime(period["start_date"], "%Y-%m-%d").strftime("%b %d")
-    end_date = datetime.strptime(period["end_date"], "%Y-%m-%d").strftime("%b %d, %Y")
-    date_range = f"{start_date} to {end_date}"
+    return _render_text(_report_context(report_data, generated_at))
+
+
+def _render_text(ctx: Dict[str, Any]) -> str:
+    """Render the plain text email from a context built by _report_context"""
+    current = ctx["current"]
+    date_range = ctx["date_range"]
+    frag = ctx["frag"]
     
     text = f"""
 Weekly Transaction Performance Report - {date_range}
@@ -419,28 +332,37 @@ Transaction Volume:
 - Declined: {current['declined_count']:,} ({current['declined_percentage']:.1f}%)
 
 Transaction Value:
-- Total Volume: ${format_number(current['total_volume_usd'])}
-- Average Transaction: ${format_number(current['avg_transaction_size_usd'])}
+- Total Volume: ${frag['total_volume']}
+- Average Transaction: ${frag['avg_transaction_size']}
 
 Revenue Performance:
-- Total Fees Collected: ${format_number(current['total_revenue_usd'])}
-- Average Fee per Transaction: ${format_number(current['avg_fee_per_transaction_usd'])}
+- Total Fees Collected: ${frag['total_revenue']}
+- Average Fee per Transaction: ${frag['avg_fee_per_transaction']}
 - Fees-to-Value Ratio: {current['fees_to_value_ratio']:.2f}%
 
 CURRENCY DISTRIBUTION
-
 """
     
-    for idx, currency_data in enumerate(current["currency_breakdown"], 1):
-        text += f"{idx}. {currency_data['currency']} - {currency_data['transaction_count']:,} transactions, ${format_number(currency_data['volume_usd'])} ({currency_data['percentage']:.1f}%)\n"
+    # Header, one line per currency, then the comparison section
+    breakdown = current["currency_breakdown"]
+    lines = [""] * (len(breakdown) + 2)
+    lines[0] = text
+    for idx, currency_data in enumerate(breakdown, 1):
+        lines[idx] = _TEXT_CURRENCY_LINE % (
+            idx,
+            currency_data["currency"],
+            format(currency_data["transaction_count"], ","),
+            format_number(currency_data["volume_usd"]),
+            currency_data["percentage"],
+        )
     
-    text += f"""
+    lines[-1] = f"""
 WEEK-OVER-WEEK COMPARISON
 
-- Transaction Volume: {'+' if changes['transaction_volume_change_pct'] > 0 else ''}{changes['transaction_volume_change_pct']:.1f}% ({'+' if changes['transaction_volume_change_absolute'] > 0 else ''}{changes['transaction_volume_change_absolute']:,} transactions)
-- Success Rate: {'+' if changes['success_rate_change_pct'] > 0 else ''}{changes['success_rate_change_pct']:.1f} percentage points
-- Revenue: {'+' if changes['revenue_change_pct'] > 0 else ''}{changes['revenue_change_pct']:.1f}% (${format_number(changes['revenue_change_absolute_usd'])})
-- Average Transaction Size: {'+' if changes['avg_transaction_size_change_pct'] > 0 else ''}{changes['avg_transaction_size_change_pct']:.1f}%
+- Transaction Volume: {frag['vol_sign']}{frag['vol_pct']}% ({frag['vol_abs_sign']}{frag['vol_abs']} transactions)
+- Success Rate: {frag['success_rate_sign']}{frag['success_rate_pct']} percentage points
+- Revenue: {frag['revenue_sign']}{frag['revenue_pct']}% (${frag['revenue_abs']})
+- Average Transaction Size: {frag['avg_size_sign']}{frag['avg_size_pct']}%
 
 Thank you for your continued dedication to maintaining our platform's reliability and performance.
 
@@ -449,10 +371,24 @@ Finance Team
 
 ---
 SpennX Transaction Performance Report
-Generated on {datetime.now().strftime("%B %d, %Y at %H:%M UTC")}
+Generated on {ctx['generated_at']}
 """
     
-    return text
+    return "\n".join(lines)
+
+
+def render_both(report_data: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Render the HTML and plain text versions of a report.
+    
+    Dates, fragments and the footer timestamp are computed once and shared
+    by both renderers.
+    
+    Returns:
+        Tuple of (html_content, plain_text_content)
+    """
+    ctx = _report_context(report_data)
+    return _render_html(ctx), _render_text(ctx)
 
 
 def send_email(
@@ -466,6 +402,9 @@ def send_email(
     """
     Send email using Gmail API.
     
+    All recipients go on one message and one messages.send call, so a
+    broadcast costs a single API round trip however many recipients it has.
+    
     Args:
         recipients: List of recipient email addresses
         subject: Email subject
@@ -1,4 +1,8 @@
 from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+# Quantize exponents for the common decimal places, so rounding skips Decimal.__pow__
+_QUANTIZE = {places: Decimal(1).scaleb(-places) for places in range(10)}
 
 def round_decimal(value: Decimal, places: int = 2) -> Decimal:
     """
@@ -8,7 +12,7 @@ def round_decimal(value: Decimal, places: int = 2) -> Decimal:
     if value is None:
         return Decimal("0.00")
     
-    quantize_value = Decimal(10) ** -places
+    quantize_value = _QUANTIZE.get(places) or Decimal(10) ** -places
     return value.quantize(quantize_value, rounding=ROUND_HALF_UP)
 
 def format_currency(value: Decimal) -> str:
@@ -19,12 +23,51 @@ def format_currency(value: Decimal) -> str:
     if value is None:
         value = Decimal("0.00")
     
+    return _format_currency_cached(value)
+
+@lru_cache(maxsize=4096)
+def _format_currency_cached(value: Decimal) -> str:
+    """Cached body of format_currency. Bounded, since most amounts are unique."""
     # Round to 2 decimal places
     rounded = round_decimal(value, 2)
     
     # Format with thousand separators
     return f"{rounded:,.2f}"
 
+# Above this magnitude a float can no longer represent every cent exactly
+_FLOAT_DISPLAY_LIMIT = 1e15
+
+def format_display(value) -> str:
+    """
+    Format a number for display with thousand separators and 2 decimal places.
+    Example: "1234567.891" -> "1,234,567.89"
+    
+    Uses float formatting, which is much cheaper than building a Decimal, and
+    falls back to Decimal for values too large for a float to hold to the cent.
+    Exact half-cent ties may round differently from format_currency, so use
+    that for amounts that have to reconcile. Values that aren't numbers are
+    returned unchanged.
+    """
+    if isinstance(value, str):
+        if not value:
+            return value
+        try:
+            num = float(value)
+        except ValueError:
+            return value
+    elif isinstance(value, Decimal):
+        # Already a Decimal: formatting it directly is exact and needs no parse
+        return f"{value:,.2f}"
+    elif isinstance(value, (int, float)):
+        num = value
+    else:
+        return value
+    
+    if -_FLOAT_DISPLAY_LIMIT < num < _FLOAT_DISPLAY_LIMIT:
+        return f"{num:,.2f}"
+    
+    return f"{Decimal(value):,.2f}"
+
 def format_percentage(value: float) -> float:
     """
     Format percentage values to 2 decimal places.
@@ -5,36 +5,174 @@ Handles Gmail API authentication and email sending using OAuth2 credentials.
 """
 
 import os
-import base64
-import pickle
 import json
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Optional
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+from functools import lru_cache
 from pathlib import Path
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+# pybase64 (SIMD) is an optional speed-up for encoding raw messages; same output as the stdlib
+try:
+    from pybase64 import b64encode_as_string
+    
+    def _b64url(data: bytes) -> str:
+        # Encodes straight to str, skipping the intermediate bytes object
+        return b64encode_as_string(data, altchars=b'-_')
+except ImportError:
+    from binascii import b2a_base64
+    
+    _URLSAFE_TRANS = bytes.maketrans(b'+/', b'-_')
+    
+    def _b64url(data: bytes) -> str:
+        # What base64.urlsafe_b64encode does, minus its two Python-level wrapper calls
+        return b2a_base64(data, newline=False).translate(_URLSAFE_TRANS).decode('ascii')
+
+
+logger = logging.getLogger(__name__)
 
 # Gmail API scopes
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
 # Paths
 CREDENTIALS_FILE = 'credentials.json'
-TOKEN_FILE = 'token.pickle'
+TOKEN_FILE = 'token.json'
+
+# Credentials shared by every thread, reused across sends until they stop
+# being valid or the API rejects them
+_creds = None
+_service_lock = threading.Lock()
+
+# Built service per thread: its httplib2.Http transport is not thread-safe, so
+# the request threadpool, the scheduler and the refresh thread each get their own
+_local = threading.local()
+
+# Retry policy for transient send failures
+MAX_SEND_ATTEMPTS = 5
+MAX_BACKOFF_SECONDS = 32
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Gmail accepts at most this many calls in one batch request
+BATCH_SIZE = 100
+
+# Credentials closer than this to expiry are refreshed in the background, so a
+# send never waits on the token endpoint; one refresh at a time
+_REFRESH_MARGIN = timedelta(minutes=5)
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gmail-token-refresh")
+_refresh_lock = threading.Lock()
+_refresh_pending = False
+
+_ENV_CREDENTIAL_VARS = ('GMAIL_CLIENT_ID', 'GMAIL_CLIENT_SECRET', 'GMAIL_REFRESH_TOKEN')
 
 
 def get_gmail_service():
     """
-    Get authenticated Gmail API service.
+    Get authenticated Gmail API service for the calling thread.
+    
+    Credentials are loaded once and shared; each thread builds its own service
+    (and HTTP transport) on first use and reuses it while those credentials
+    are valid. Expired credentials are loaded or refreshed again and the
+    services rebuilt.
+    
+    Returns:
+        Gmail API service object
+    """
+    global _creds
+    
+    creds = _creds
+    if creds is not None and creds.valid:
+        if _expires_soon(creds):
+            _schedule_refresh(creds)
+    else:
+        with _service_lock:
+            # Another thread may have reloaded them while we waited
+            if _creds is None or not _creds.valid:
+                _creds = _load_credentials()
+            creds = _creds
+    
+    if getattr(_local, 'creds', None) is creds:
+        return _local.service
+    
+    try:
+        # The discovery document ships with the client library, so no HTTP fetch
+        service = build('gmail', 'v1', credentials=creds, cache_discovery=False, static_discovery=True)
+    except HttpError as error:
+        logger.error('An error occurred: %s', error)
+        raise
+    
+    # users().messages() builds new Resource objects on every call (~1ms),
+    # so bind the send method once per service
+    service._cached_send = service.users().messages().send
+    
+    _local.service, _local.creds = service, creds
+    return service
+
+
+def reset_gmail_service():
+    """Drop the cached credentials so the next call authenticates again and every thread rebuilds its service."""
+    global _creds
+    with _service_lock:
+        _creds = None
+
+
+def _expires_soon(creds) -> bool:
+    # google-auth keeps expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry is not None and creds.expiry - now < _REFRESH_MARGIN
+
+
+def _schedule_refresh(creds) -> None:
+    """Refresh the credentials on the background thread unless a refresh is already in flight."""
+    global _refresh_pending
+    with _refresh_lock:
+        if _refresh_pending:
+            return
+        _refresh_pending = True
+    _refresh_executor.submit(_refresh_credentials, creds)
+
+
+def _refresh_credentials(creds) -> None:
+    global _refresh_pending
+    try:
+        creds.refresh(Request())
+        if not _env_credentials_configured():
+            _save_token(creds)
+    except Exception as e:
+        # The next send still has the current token; it refreshes on expiry or 401
+        logger.warning("Error refreshing token in the background: %s", e)
+    finally:
+        with _refresh_lock:
+            _refresh_pending = False
+
+
+def _env_credentials_configured() -> bool:
+    return all(os.getenv(var) for var in _ENV_CREDENTIAL_VARS)
+
+
+def _save_token(creds) -> None:
+    """Write the token file atomically so a concurrent reader never sees a partial file."""
+    tmp_file = f"{TOKEN_FILE}.tmp"
+    Path(tmp_file).write_text(creds.to_json(), encoding='utf-8')
+    os.replace(tmp_file, TOKEN_FILE)
+
+
+def _load_credentials():
+    """
+    Load valid Gmail API credentials.
     
     Priority order for authentication:
     1. Environment variables (for server deployment)
-    2. token.pickle file (for local development)
+    2. token.json file (for local development)
     3. credentials.json + OAuth flow (for initial setup)
     
     Environment variables needed for server deployment:
@@ -43,12 +181,12 @@ def get_gmail_service():
     - GMAIL_REFRESH_TOKEN: OAuth2 refresh token
     
     Returns:
-        Gmail API service object
+        Valid OAuth2 credentials
     """
     creds = None
     
     # Try environment variables first (for server deployment)
-    if all(os.getenv(var) for var in ['GMAIL_CLIENT_ID', 'GMAIL_CLIENT_SECRET', 'GMAIL_REFRESH_TOKEN']):
+    if _env_credentials_configured():
         creds = Credentials(
             token=None,  # Will be refreshed
             refresh_token=os.getenv('GMAIL_REFRESH_TOKEN'),
@@ -61,13 +199,15 @@ def get_gmail_service():
         try:
             creds.refresh(Request())
         except Exception as e:
-            print(f"Error refreshing token from environment variables: {e}")
+            logger.error("Error refreshing token from environment variables: %s", e)
             raise
     
-    # Fallback to token.pickle (for local development)
-    elif os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, 'rb') as token:
-            creds = pickle.load(token)
+    # Fallback to token.json (for local development)
+    else:
+        try:
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        except FileNotFoundError:
+            pass
     
     # If there are no (valid) credentials available, let the user log in
     if not creds or not creds.valid:
@@ -75,34 +215,33 @@ def get_gmail_service():
             try:
                 creds.refresh(Request())
             except Exception as e:
-                print(f"Error refreshing token: {e}")
+                logger.warning("Error refreshing token: %s", e)
                 # Delete invalid token and re-authenticate
-                if os.path.exists(TOKEN_FILE):
+                try:
                     os.remove(TOKEN_FILE)
+                except FileNotFoundError:
+                    pass
                 creds = None
         
         if not creds:
-            if not os.path.exists(CREDENTIALS_FILE):
+            # Only needed for the interactive first-time setup, so imported here
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            
+            try:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    CREDENTIALS_FILE, SCOPES)
+            except FileNotFoundError:
                 raise FileNotFoundError(
                     f"Authentication failed. Either:\n"
                     f"1. Set environment variables: GMAIL_CLIENT_ID, GMAIL_CLIENT_SECRET, GMAIL_REFRESH_TOKEN\n"
                     f"2. Or provide credentials file '{CREDENTIALS_FILE}' for OAuth flow"
-                )
-            
-            flow = InstalledAppFlow.from_client_secrets_file(
-                CREDENTIALS_FILE, SCOPES)
+                ) from None
             creds = flow.run_local_server(port=0)
             
             # Save the credentials for the next run (only for local development)
-            with open(TOKEN_FILE, 'wb') as token:
-                pickle.dump(creds, token)
+            _save_token(creds)
     
-    try:
-        service = build('gmail', 'v1', credentials=creds)
-        return service
-    except HttpError as error:
-        print(f'An error occurred: {error}')
-        raise
+    return creds
 
 
 def create_message(sender: str, to: List[str], subject: str, html_content: str, plain_text_content: str):
@@ -119,21 +258,64 @@ def create_message(sender: str, to: List[str], subject: str, html_content: str,
     Returns:
         An object containing a base64url encoded email object
     """
-    message = MIMEMultipart('alternative')
-    message['to'] = ', '.join(to)
-    message['from'] = sender
-    message['subject'] = subject
+    return {'raw': _make_raw_message(sender, tuple(to), subject, html_content, plain_text_content)}
+
+
+@lru_cache(maxsize=16)
+def _make_raw_message(sender: str, to: Tuple[str, ...], subject: str, html_content: str, plain_text_content: str) -> str:
+    """
+    Build and base64url-encode a message. Cached, so repeating an identical
+    send (test emails, retries) skips MIME construction and encoding.
+    """
+    message = EmailMessage()
+    message['To'] = ', '.join(to)
+    message['From'] = sender
+    message['Subject'] = subject
     
-    # Attach plain text and HTML versions
-    part1 = MIMEText(plain_text_content, 'plain')
-    part2 = MIMEText(html_content, 'html')
+    # Plain text body with the HTML version as its alternative
+    message.set_content(plain_text_content)
+    message.add_alternative(html_content, subtype='html')
     
-    message.attach(part1)
-    message.attach(part2)
+    # Serialize once at the bytes level and encode for the API's raw field
+    return _b64url(message.as_bytes())
+
+
+def _send(service, message: dict) -> dict:
+    return service._cached_send(userId='me', body=message).execute()
+
+
+def _send_with_retry(message: dict) -> dict:
+    """
+    Send a message, retrying transient failures.
     
-    # Encode the message
-    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-    return {'raw': raw_message}
+    Rate limits (429) and server errors are retried with exponential backoff
+    and jitter, honouring Retry-After when the API sends it. A 401 means the
+    credentials were revoked or rotated: authenticate again and retry once.
+    """
+    reauthenticated = False
+    attempt = 0
+    while True:
+        try:
+            return _send(get_gmail_service(), message)
+        except HttpError as error:
+            status = error.resp.status
+            if status == 401 and not reauthenticated:
+                reset_gmail_service()
+                reauthenticated = True
+                continue
+            attempt += 1
+            if status not in _RETRY_STATUSES or attempt >= MAX_SEND_ATTEMPTS:
+                raise
+            delay = _retry_delay(error, attempt)
+            logger.warning("Gmail API returned %s, retrying in %.1fs", status, delay)
+            time.sleep(delay)
+
+
+def _retry_delay(error: HttpError, attempt: int) -> float:
+    retry_after = error.resp.get('retry-after')
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), MAX_BACKOFF_SECONDS)
+    return min(2 ** (attempt - 1) + random.random(), MAX_BACKOFF_SECONDS)
 
 
 def send_gmail_message(
@@ -157,9 +339,6 @@ def send_gmail_message(
         True if email sent successfully, False otherwise
     """
     try:
-        # Get Gmail service
-        service = get_gmail_service()
-        
         # Use 'me' as sender if not specified (authenticated user)
         if not sender_email:
             sender_email = 'me'
@@ -173,26 +352,64 @@ def send_gmail_message(
             plain_text_content=plain_text_content
         )
         
-        # Send message
-        sent_message = service.users().messages().send(
-            userId='me',
-            body=message
-        ).execute()
+        # Send message with the cached service
+        sent_message = _send_with_retry(message)
         
-        print(f"Email sent successfully. Message ID: {sent_message['id']}")
+        logger.info("Email sent successfully. Message ID: %s", sent_message['id'])
         return True
         
     except HttpError as error:
-        print(f'An error occurred while sending email: {error}')
+        logger.error('An error occurred while sending email: %s', error)
         return False
     except FileNotFoundError as error:
-        print(f'Credentials file not found: {error}')
+        logger.error('Credentials file not found: %s', error)
         return False
     except Exception as error:
-        print(f'Unexpected error while sending email: {error}')
+        logger.exception('Unexpected error while sending email: %s', error)
         return False
 
 
+def send_gmail_messages(messages: List[dict]) -> List[bool]:
+    """
+    Send several prepared messages using Gmail API batch requests.
+    
+    Each batch carries up to BATCH_SIZE sends in one HTTP request, so N
+    personalized emails cost one round trip per hundred instead of one each.
+    
+    Args:
+        messages: Messages built with create_message
+    
+    Returns:
+        Per-message success flags, in the same order as messages
+    """
+    results = [False] * len(messages)
+    
+    def record(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            logger.error('An error occurred while sending email %d: %s', index, exception)
+            return
+        results[index] = True
+        logger.info("Email sent successfully. Message ID: %s", response['id'])
+    
+    try:
+        service = get_gmail_service()
+        send = service._cached_send
+        for start in range(0, len(messages), BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=record)
+            for index in range(start, min(start + BATCH_SIZE, len(messages))):
+                batch.add(send(userId='me', body=messages[index]), request_id=str(index))
+            batch.execute()
+    except HttpError as error:
+        logger.error('An error occurred while sending emails: %s', error)
+    except FileNotFoundError as error:
+        logger.error('Credentials file not found: %s', error)
+    except Exception as error:
+        logger.exception('Unexpected error while sending emails: %s', error)
+    
+    return results
+
+
 def test_gmail_connection():
     """
     Test Gmail API connection by attempting to get the service.
@@ -215,20 +432,8 @@ def test_gmail_connection():
         return False
 
 
-def send_test_email(recipient: str) -> bool:
-    """
-    Send a test email to verify Gmail API is working.
-    
-    Args:
-        recipient: Email address to send test email to
-    
-    Returns:
-        True if test email sent successfully, False otherwise
-    """
-    try:
-        print(f"\nSending test email to {recipient}...")
-        
-        html_content = """
+# Body of the setup test email
+_TEST_HTML = """
         <html>
             <body style="font-family: Arial, sans-serif; padding: 20px;">
                 <h2 style="color: #317CFF;">Gmail API Test Email</h2>
@@ -241,8 +446,8 @@ def send_test_email(recipient: str) -> bool:
             </body>
         </html>
         """
-        
-        plain_text = """
+
+_TEST_PLAIN = """
         Gmail API Test Email
         
         This is a test email from your SpennX Dashboard API.
@@ -252,12 +457,26 @@ def send_test_email(recipient: str) -> bool:
         ---
         Sent via Gmail API using OAuth2 authentication
         """
+
+
+def send_test_email(recipient: str) -> bool:
+    """
+    Send a test email to verify Gmail API is working.
+    
+    Args:
+        recipient: Email address to send test email to
+    
+    Returns:
+        True if test email sent successfully, False otherwise
+    """
+    try:
+        print(f"\nSending test email to {recipient}...")
         
         success = send_gmail_message(
             recipients=[recipient],
             subject="Gmail API Test - SpennX Dashboard",
-            html_content=html_content,
-            plain_text_content=plain_text,
+            html_content=_TEST_HTML,
+            plain_text_content=_TEST_PLAIN,
             sender_email=None  # Uses authenticated user
         )
         
@@ -1,15 +1,17 @@
 from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_, or_, cast, String
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, desc, and_, or_, case, cast, String, bindparam, select
 from typing import List, Optional
+from collections import defaultdict
 from decimal import Decimal
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
-from app.database import get_db
+from app.database import get_db, run_concurrently
 from app.models import TransactionCache
 from app.schemas import (
-    TransactionResponse, DashboardStats, RecipientData, 
+    TransactionResponse, DashboardStats,
     TransactionsLiveView, PeriodStats, TransactionPulse,
     NetIncomeStats, CountryCurrencyVolume, TimeInterval,
     TransactionStatusBreakdown, CurrencyVolumeBreakdown,
@@ -17,12 +19,17 @@ from app.schemas import (
     TodayTransactionItem, TodayTransactionsSummary,
     WeeklyPerformanceReport, SendWeeklyEmailRequest
 )
-from app.utils import get_date_range, parse_datetime
-from app.currency_rates import convert_to_usd
+from app.config import get_settings
+from app.utils import exclusive_end, get_date_range, parse_datetime, parse_range_end
+from app.aggregates import (
+    CURRENCY, EMPTY_TOTALS, ERROR_STATUSES, PeriodTotals, UsdConverters, daily_rollup,
+    daily_status_totals, period_totals, usd_totals, usd_totals_by
+)
 from app.formatters import format_currency, format_percentage
 from app.reports import generate_weekly_performance_report
-from app.email_service import generate_html_email, generate_plain_text_email, send_email
+from app.email_service import render_both, send_email
 from app.scheduler import get_scheduler
+from app.response_cache import ETagMiddleware, cached_response
 import app.sync_routes as sync_routes
 import logging
 import sys
@@ -52,7 +59,9 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="SpennX Live Pulse Dashboard API", 
     version="2.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Responses are rendered with orjson instead of the stdlib json encoder
+    default_response_class=ORJSONResponse
 )
 
 # Include the transaction sync routes
@@ -66,6 +75,86 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Polled dashboard endpoints reuse their response for this long
+DASHBOARD_CACHE_SECONDS = 10
+
+# Analytics aggregations are cached per query parameters; the transaction sync clears them
+OVERVIEW_CACHE_SECONDS = 60
+DAILY_TREND_CACHE_SECONDS = 300
+
+# Dashboard and analytics responses carry an ETag, so repeat polls can get a 304
+app.add_middleware(
+    ETagMiddleware,
+    path_prefixes=(
+        "/api/live-view", "/api/transaction-pulse", "/api/net-income",
+        "/api/dashboard/", "/api/analytics/"
+    ),
+    max_age=5
+)
+
+# Columns read by TransactionResponse; credit_id, rate and the cache timestamps are never loaded
+TRANSACTION_RESPONSE_COLUMNS = load_only(
+    TransactionCache.id, TransactionCache.amount, TransactionCache.currency,
+    TransactionCache.human_readable_amount, TransactionCache.charge,
+    TransactionCache.human_readable_charge, TransactionCache.status,
+    TransactionCache.decline_reason, TransactionCache.mode, TransactionCache.type,
+    TransactionCache.description, TransactionCache.external_id,
+    TransactionCache.from_wallet, TransactionCache.to_wallet,
+    TransactionCache.debit_id, TransactionCache.created_at, TransactionCache.recipient
+)
+
+# Columns read for TodayTransactionItem
+TODAY_ITEM_COLUMNS = load_only(
+    TransactionCache.id, TransactionCache.created_at, TransactionCache.status,
+    TransactionCache.human_readable_amount, TransactionCache.human_readable_charge,
+    TransactionCache.currency, TransactionCache.type, TransactionCache.description,
+    TransactionCache.from_wallet, TransactionCache.to_wallet, TransactionCache.recipient
+)
+
+# Statements for the polled endpoints, built once at import; the window starts
+# are bound per request, so the statement text is the same on every call
+
+# Transactions since minute_start and since hour_start (minute_start >= hour_start)
+RECENT_COUNTS_STMT = select(
+    func.sum(case((TransactionCache.created_at >= bindparam("minute_start"), 1), else_=0)),
+    func.count(TransactionCache.id)
+).where(TransactionCache.created_at >= bindparam("hour_start"))
+
+# Successful charges since minute_start and since hour_start
+RECENT_INCOME_STMT = select(
+    func.sum(case(
+        (TransactionCache.created_at >= bindparam("minute_start"), TransactionCache.human_readable_charge)
+    )),
+    func.sum(TransactionCache.human_readable_charge)
+).where(
+    TransactionCache.created_at >= bindparam("hour_start"),
+    TransactionCache.status == "success"
+)
+
+def _distinct_wallets_since(param: str):
+    return func.count(func.distinct(case(
+        (TransactionCache.created_at >= bindparam(param), TransactionCache.from_wallet)
+    )))
+
+# Unique sending wallets since today_start, week_start and month_start, in one scan from since
+ACTIVE_WALLETS_STMT = select(
+    _distinct_wallets_since("today_start"),
+    _distinct_wallets_since("week_start"),
+    _distinct_wallets_since("month_start")
+).where(
+    TransactionCache.created_at >= bindparam("since"),
+    TransactionCache.from_wallet.isnot(None)
+)
+
+_ZERO = Decimal(0)
+
+# Daily-trend count field for each status; other statuses only add to transaction_count
+STATUS_BUCKET = {
+    "success": "success_count",
+    "pending": "pending_count",
+    **dict.fromkeys(ERROR_STATUSES, "failed_count")
+}
+
 def calculate_period_stats(db: Session, start: datetime, end: datetime, period_name: str) -> PeriodStats:
     """
     Calculate statistics for a given time period.
@@ -77,54 +166,26 @@ def calculate_period_stats(db: Session, start: datetime, end: datetime, period_n
     base_query = db.query(TransactionCache).filter(
         and_(
             TransactionCache.created_at >= start,
-            TransactionCache.created_at <= end
+            TransactionCache.created_at < exclusive_end(end)
         )
     )
     
-    # Query for successful transactions only
-    success_query = base_query.filter(TransactionCache.status == "success")
-    
-    # Total transactions (all statuses)
-    total_transactions = base_query.count()
-    
-    # Successful transactions count
-    success_count = success_query.count()
-    
-    # Calculate USD equivalent volume
-    # For each transaction: convert to USD using rate from JSON or predefined rates
-    total_volume_usd = Decimal(0)
-    total_revenue_usd = Decimal(0)
-    
-    for txn in success_query.all():
-        amount = txn.human_readable_amount or Decimal(0)
-        charge = txn.human_readable_charge or Decimal(0)
-        currency = txn.currency or "USD"
-        
-        # Get rate from recipient JSON if available
-        rate_from_json = None
-        if txn.recipient and isinstance(txn.recipient, dict) and 'rate' in txn.recipient:
-            try:
-                rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-            except:
-                rate_from_json = None
-        
-        # Convert to USD using our conversion function
-        total_volume_usd += convert_to_usd(amount, currency, rate_from_json)
-        total_revenue_usd += convert_to_usd(charge, currency, rate_from_json)
+    # Status counts and USD equivalent volume/revenue of successful transactions, in one query
+    return build_period_stats(period_name, start, end, period_totals(base_query))
+
+def build_period_stats(period_name: str, start: datetime, end: datetime, totals: PeriodTotals) -> PeriodStats:
+    """Build the PeriodStats response from aggregated period totals."""
+    success_count = totals.success.count
+    total_volume_usd = totals.success.volume_usd
+    total_revenue_usd = totals.success.revenue_usd
     
     # Average in USD
     avg_amount = total_volume_usd / success_count if success_count > 0 else Decimal(0)
     avg_revenue = total_revenue_usd / success_count if success_count > 0 else Decimal(0)
     
     # Error rate calculation (failed, declined, reversed)
-    error_count = base_query.filter(
-        or_(
-            TransactionCache.status == "failed",
-            TransactionCache.status == "declined",
-            TransactionCache.status == "reversed"
-        )
-    ).count()
-    error_rate = (error_count / total_transactions * 100) if total_transactions > 0 else 0.0
+    total_transactions = totals.total_count
+    error_rate = (totals.error_count / total_transactions * 100) if total_transactions > 0 else 0.0
     
     return PeriodStats(
         period_name=period_name,
@@ -152,10 +213,16 @@ def read_root():
     }
 
 @app.get("/api/live-view", response_model=TransactionsLiveView)
+@cached_response(DASHBOARD_CACHE_SECONDS)
 def get_transactions_live_view(db: Session = Depends(get_db)):
     """
     Get transactions live view structured by time intervals.
     All calculations use human_readable_amount for accuracy across different currencies.
+    
+    staleness_seconds is the age of the oldest cached day totals used. Past
+    days are cached until the next sync (at most 30 minutes) and today's
+    totals for at most 5 minutes, so today's numbers can lag by up to 5
+    minutes between syncs.
     """
     intervals = {
         "today": "Today",
@@ -167,14 +234,19 @@ def get_transactions_live_view(db: Session = Depends(get_db)):
         "year_to_date": "Year to Date"
     }
     
-    stats = {}
-    for key, name in intervals.items():
-        start, end = get_date_range(key)
-        stats[key] = calculate_period_stats(db, start, end, name)
+    # All seven periods are summed from per-day totals held in the rollup cache
+    ranges = {key: get_date_range(key) for key in intervals}
+    totals, staleness_seconds = daily_rollup.periods(db, ranges)
     
-    return TransactionsLiveView(**stats)
+    stats = {
+        key: build_period_stats(name, *ranges[key], totals[key])
+        for key, name in intervals.items()
+    }
+    
+    return TransactionsLiveView(**stats, staleness_seconds=round(staleness_seconds, 1))
 
 @app.get("/api/transaction-pulse", response_model=TransactionPulse)
+@cached_response(DASHBOARD_CACHE_SECONDS)
 def get_transaction_pulse(db: Session = Depends(get_db)):
     """
     Get real-time transaction pulse metrics.
@@ -182,78 +254,44 @@ def get_transaction_pulse(db: Session = Depends(get_db)):
     """
     now = datetime.now()
     
-    # Last minute
     one_min_ago = now - timedelta(minutes=1)
-    txn_last_min = db.query(func.count(TransactionCache.id)).filter(
-        TransactionCache.created_at >= one_min_ago
-    ).scalar()
-    
-    # Last hour
     one_hour_ago = now - timedelta(hours=1)
-    txn_last_hour = db.query(func.count(TransactionCache.id)).filter(
-        TransactionCache.created_at >= one_hour_ago
-    ).scalar()
-    
-    # Today - calculate USD equivalent using rate from recipient JSON
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_base_query = db.query(TransactionCache).filter(TransactionCache.created_at >= today_start)
+    week_start = now - timedelta(days=now.weekday())
+    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     
-    # Only count successful transactions for volume
-    today_success_query = today_base_query.filter(TransactionCache.status == "success")
-    txn_today = today_success_query.count()
+    # The three lookups are independent, so they run at the same time
+    (txn_last_min, txn_last_hour), today, (active_today, active_week, active_month) = run_concurrently(
+        db,
+        # Last minute and last hour, counted in one query
+        lambda session: session.execute(
+            RECENT_COUNTS_STMT, {"minute_start": one_min_ago, "hour_start": one_hour_ago}
+        ).one(),
+        # Status counts and successful volume (USD equivalent) for today, cached until the next sync
+        lambda session: daily_rollup.today(session)[0],
+        # Active users (unique from_wallet) for today, this week and this month, in one scan
+        lambda session: session.execute(ACTIVE_WALLETS_STMT, {
+            "today_start": today_start,
+            "week_start": week_start,
+            "month_start": month_start,
+            "since": min(week_start, month_start)
+        }).one()
+    )
+    txn_last_min = txn_last_min or 0
     
-    # Calculate USD equivalent volume using proper conversion
-    volume_today_usd = Decimal(0)
-    for txn in today_success_query.all():
-        amount = txn.human_readable_amount or Decimal(0)
-        currency = txn.currency or "USD"
-        
-        rate_from_json = None
-        if txn.recipient and isinstance(txn.recipient, dict) and 'rate' in txn.recipient:
-            try:
-                rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-            except:
-                rate_from_json = None
-        
-        volume_today_usd += convert_to_usd(amount, currency, rate_from_json)
+    txn_today = today.success.count
+    volume_today_usd = today.success.volume_usd
     
     avg_size = volume_today_usd / txn_today if txn_today > 0 else Decimal(0)
     
     # Error rate today (failed, declined, reversed)
-    total_today = today_base_query.count()
-    errors_today = today_base_query.filter(
-        or_(
-            TransactionCache.status == "failed",
-            TransactionCache.status == "declined",
-            TransactionCache.status == "reversed"
-        )
-    ).count()
+    total_today = today.total_count
+    errors_today = today.error_count
     error_rate = (errors_today / total_today * 100) if total_today > 0 else 0.0
     
-    # Active users (unique from_wallet or external_id)
-    active_today = db.query(func.count(func.distinct(TransactionCache.from_wallet))).filter(
-        TransactionCache.created_at >= today_start,
-        TransactionCache.from_wallet.isnot(None)
-    ).scalar()
-    
-    week_start = now - timedelta(days=now.weekday())
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    active_week = db.query(func.count(func.distinct(TransactionCache.from_wallet))).filter(
-        TransactionCache.created_at >= week_start,
-        TransactionCache.from_wallet.isnot(None)
-    ).scalar()
-    
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    active_month = db.query(func.count(func.distinct(TransactionCache.from_wallet))).filter(
-        TransactionCache.created_at >= month_start,
-        TransactionCache.from_wallet.isnot(None)
-    ).scalar()
-    
     # New users today (simplified - count unique wallets created today)
-    new_users = db.query(func.count(func.distinct(TransactionCache.from_wallet))).filter(
-        TransactionCache.created_at >= today_start,
-        TransactionCache.from_wallet.isnot(None)
-    ).scalar()
+    new_users = active_today
     
     return TransactionPulse(
         transactions_per_minute=float(txn_last_min),
@@ -269,6 +307,7 @@ def get_transaction_pulse(db: Session = Depends(get_db)):
     )
 
 @app.get("/api/net-income", response_model=NetIncomeStats)
+@cached_response(DASHBOARD_CACHE_SECONDS)
 def get_net_income_stats(db: Session = Depends(get_db)):
     """
     Get net income statistics with multi-currency support.
@@ -276,69 +315,69 @@ def get_net_income_stats(db: Session = Depends(get_db)):
     """
     now = datetime.now()
     
-    # Income per minute (success only)
     one_min_ago = now - timedelta(minutes=1)
-    income_min = db.query(func.sum(TransactionCache.human_readable_charge)).filter(
-        TransactionCache.created_at >= one_min_ago,
-        TransactionCache.status == "success"
-    ).scalar() or Decimal(0)
-    
-    # Income per hour (success only)
     one_hour_ago = now - timedelta(hours=1)
-    income_hour = db.query(func.sum(TransactionCache.human_readable_charge)).filter(
-        TransactionCache.created_at >= one_hour_ago,
-        TransactionCache.status == "success"
-    ).scalar() or Decimal(0)
-    
-    # Income per day (success only) - convert to USD
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_base_query = db.query(TransactionCache).filter(TransactionCache.created_at >= today_start)
-    today_success_query = today_base_query.filter(TransactionCache.status == "success")
-    
-    # Calculate USD equivalent income and volume using proper conversion
-    income_day_usd = Decimal(0)
-    total_moved_usd = Decimal(0)
+    ytd_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
     
-    for txn in today_success_query.all():
-        amount = txn.human_readable_amount or Decimal(0)
-        charge = txn.human_readable_charge or Decimal(0)
-        currency = txn.currency or "USD"
-        
-        rate_from_json = None
-        if txn.recipient and isinstance(txn.recipient, dict) and 'rate' in txn.recipient:
-            try:
-                rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-            except:
-                rate_from_json = None
-        
-        income_day_usd += convert_to_usd(charge, currency, rate_from_json)
-        total_moved_usd += convert_to_usd(amount, currency, rate_from_json)
+    def top_countries_query(session: Session):
+        # Top 5 countries by volume (from recipient JSON) - using human_readable_amount (success only)
+        return session.query(
+            cast(TransactionCache.recipient['country'], String).label('country'),
+            func.sum(TransactionCache.human_readable_amount).label('volume'),
+            func.count(TransactionCache.id).label('count')
+        ).filter(
+            TransactionCache.created_at >= today_start,
+            TransactionCache.status == "success",
+            TransactionCache.recipient['country'].isnot(None)
+        ).group_by('country').order_by(desc('volume')).limit(5).all()
+    
+    def top_currencies_query(session: Session):
+        # Top 5 currencies by volume - using human_readable_amount for accurate totals (success only)
+        return session.query(
+            TransactionCache.currency,
+            func.sum(TransactionCache.human_readable_amount).label('volume'),
+            func.count(TransactionCache.id).label('count')
+        ).filter(
+            TransactionCache.created_at >= today_start,
+            TransactionCache.status == "success"
+        ).group_by(TransactionCache.currency).order_by(desc('volume')).limit(5).all()
     
-    success_count_today = today_success_query.count()
+    def ytd_revenue_query(session: Session):
+        # YTD accumulated revenue (success only)
+        return session.query(func.sum(TransactionCache.human_readable_charge)).filter(
+            TransactionCache.created_at >= ytd_start,
+            TransactionCache.status == "success"
+        ).scalar()
+    
+    # The lookups are independent, so they run at the same time
+    (income_min, income_hour), today, top_countries_raw, top_currencies_raw, ytd_revenue = run_concurrently(
+        db,
+        # Income per minute and per hour (success only), summed in one query
+        lambda session: session.execute(
+            RECENT_INCOME_STMT, {"minute_start": one_min_ago, "hour_start": one_hour_ago}
+        ).one(),
+        # Status counts and USD equivalent income and volume for today, cached until the next sync
+        lambda session: daily_rollup.today(session)[0],
+        top_countries_query,
+        top_currencies_query,
+        ytd_revenue_query
+    )
+    income_min = income_min or Decimal(0)
+    income_hour = income_hour or Decimal(0)
+    ytd_revenue = ytd_revenue or Decimal(0)
+    
+    # Income per day (success only) - converted to USD
+    income_day_usd = today.success.revenue_usd
+    total_moved_usd = today.success.volume_usd
+    success_count_today = today.success.count
     avg_sent = total_moved_usd / success_count_today if success_count_today > 0 else Decimal(0)
     
     # Error rate (failed, declined, reversed)
-    total_today = today_base_query.count()
-    errors_today = today_base_query.filter(
-        or_(
-            TransactionCache.status == "failed",
-            TransactionCache.status == "declined",
-            TransactionCache.status == "reversed"
-        )
-    ).count()
+    total_today = today.total_count
+    errors_today = today.error_count
     error_rate = (errors_today / total_today * 100) if total_today > 0 else 0.0
     
-    # Top 5 countries by volume (from recipient JSON) - using human_readable_amount (success only)
-    top_countries_raw = db.query(
-        cast(TransactionCache.recipient['country'], String).label('country'),
-        func.sum(TransactionCache.human_readable_amount).label('volume'),
-        func.count(TransactionCache.id).label('count')
-    ).filter(
-        TransactionCache.created_at >= today_start,
-        TransactionCache.status == "success",
-        TransactionCache.recipient['country'].isnot(None)
-    ).group_by('country').order_by(desc('volume')).limit(5).all()
-    
     top_countries = [
         CountryCurrencyVolume(
             country=row.country,
@@ -349,16 +388,6 @@ def get_net_income_stats(db: Session = Depends(get_db)):
         for row in top_countries_raw
     ]
     
-    # Top 5 currencies by volume - using human_readable_amount for accurate totals (success only)
-    top_currencies_raw = db.query(
-        TransactionCache.currency,
-        func.sum(TransactionCache.human_readable_amount).label('volume'),
-        func.count(TransactionCache.id).label('count')
-    ).filter(
-        TransactionCache.created_at >= today_start,
-        TransactionCache.status == "success"
-    ).group_by(TransactionCache.currency).order_by(desc('volume')).limit(5).all()
-    
     top_currencies = [
         CountryCurrencyVolume(
             country=None,
@@ -369,13 +398,6 @@ def get_net_income_stats(db: Session = Depends(get_db)):
         for row in top_currencies_raw
     ]
     
-    # YTD accumulated revenue (success only)
-    ytd_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-    ytd_revenue = db.query(func.sum(TransactionCache.human_readable_charge)).filter(
-        TransactionCache.created_at >= ytd_start,
-        TransactionCache.status == "success"
-    ).scalar() or Decimal(0)
-    
     return NetIncomeStats(
         income_per_minute=format_currency(income_min),
         income_per_hour=format_currency(income_hour),
@@ -395,35 +417,22 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
     Converts all amounts to USD using rate from recipient JSON.
     Only counts successful transactions for volume calculations.
     """
-    # Get all successful transactions
-    success_query = db.query(TransactionCache).filter(TransactionCache.status == "success")
-    total_transactions = success_query.count()
-    
-    # Calculate USD equivalent volume using proper conversion
-    total_volume_usd = Decimal(0)
-    for txn in success_query.all():
-        amount = txn.human_readable_amount or Decimal(0)
-        currency = txn.currency or "USD"
-        
-        rate_from_json = None
-        if txn.recipient and isinstance(txn.recipient, dict) and 'rate' in txn.recipient:
-            try:
-                rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-            except:
-                rate_from_json = None
-        
-        total_volume_usd += convert_to_usd(amount, currency, rate_from_json)
-    
-    # Status counts
-    pending_count = db.query(func.count(TransactionCache.id)).filter(TransactionCache.status == "pending").scalar()
-    completed_count = db.query(func.count(TransactionCache.id)).filter(TransactionCache.status == "success").scalar()
-    failed_count = db.query(func.count(TransactionCache.id)).filter(
-        or_(
-            TransactionCache.status == "failed",
-            TransactionCache.status == "declined",
-            TransactionCache.status == "reversed"
-        )
-    ).scalar()
+    # Successful transactions with USD equivalent volume, aggregated in SQL
+    success = usd_totals(db.query(TransactionCache).filter(TransactionCache.status == "success"))
+    total_transactions = success.count
+    total_volume_usd = success.volume_usd
+    
+    # Status counts: completed is the success count above, pending and failed in one query
+    completed_count = success.count
+    is_failed = TransactionCache.status.in_(ERROR_STATUSES)
+    pending_count, failed_count = db.query(
+        func.sum(case((TransactionCache.status == "pending", 1), else_=0)),
+        func.sum(case((is_failed, 1), else_=0))
+    ).filter(
+        or_(TransactionCache.status == "pending", is_failed)
+    ).one()
+    pending_count = pending_count or 0
+    failed_count = failed_count or 0
     
     # Average in USD
     avg_amount = total_volume_usd / total_transactions if total_transactions > 0 else Decimal(0)
@@ -459,7 +468,7 @@ def get_transactions(
     - YYYY-MM-DD (e.g., 2024-01-15)
     - YYYY-MM-DD HH:MM:SS (e.g., 2024-01-15 14:30:00)
     """
-    query = db.query(TransactionCache)
+    query = db.query(TransactionCache).options(TRANSACTION_RESPONSE_COLUMNS)
     
     if status:
         query = query.filter(TransactionCache.status == status)
@@ -473,10 +482,7 @@ def get_transactions(
             
             if end_date:
                 end_dt = parse_datetime(end_date)
-                # If only date provided, set to end of day
-                if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(TransactionCache.created_at <= end_dt)
+                query = query.filter(TransactionCache.created_at < exclusive_end(end_dt))
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
     elif interval:
@@ -485,21 +491,13 @@ def get_transactions(
         query = query.filter(
             and_(
                 TransactionCache.created_at >= start,
-                TransactionCache.created_at <= end
+                TransactionCache.created_at < exclusive_end(end)
             )
         )
     
     transactions = query.order_by(desc(TransactionCache.created_at)).offset(skip).limit(limit).all()
     
-    return [
-        TransactionResponse(
-            **{k: v for k, v in t.__dict__.items() if k not in ['_sa_instance_state', 'recipient', 'human_readable_amount', 'human_readable_charge']},
-            recipient=RecipientData(**t.recipient) if t.recipient else None,
-            human_readable_amount=format_currency(t.human_readable_amount),
-            human_readable_charge=format_currency(t.human_readable_charge)
-        )
-        for t in transactions
-    ]
+    return [TransactionResponse.model_validate(t) for t in transactions]
 
 @app.get("/api/transactions/today", response_model=TodayTransactionsSummary)
 def get_today_transactions(
@@ -542,8 +540,8 @@ def get_today_transactions(
     if status:
         base_query = base_query.filter(TransactionCache.status == status)
     
-    # Get transactions ordered by most recent first
-    transactions = base_query.order_by(desc(TransactionCache.created_at)).limit(limit).all()
+    # Get transactions ordered by most recent first, loading only the columns the items use
+    transactions = base_query.options(TODAY_ITEM_COLUMNS).order_by(desc(TransactionCache.created_at)).limit(limit).all()
     
     # Calculate summary stats
     total_count = 0
@@ -555,6 +553,7 @@ def get_today_transactions(
     
     # Build transaction list with USD conversion
     transaction_items = []
+    converters = UsdConverters()
     
     for txn in transactions:
         # Get amounts
@@ -562,18 +561,15 @@ def get_today_transactions(
         charge = txn.human_readable_charge or Decimal(0)
         currency = txn.currency or "USD"
         
-        # Get rate from recipient JSON
-        rate_from_json = None
-        if txn.recipient and isinstance(txn.recipient, dict):
-            if 'rate' in txn.recipient:
-                try:
-                    rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-                except:
-                    rate_from_json = None
+        # Rate from recipient JSON, as text so any JSON value can key the converter cache
+        raw_rate = None
+        if txn.recipient and isinstance(txn.recipient, dict) and txn.recipient.get('rate'):
+            raw_rate = str(txn.recipient['rate'])
         
         # Convert to USD
-        amount_usd = convert_to_usd(amount, currency, rate_from_json)
-        charge_usd = convert_to_usd(charge, currency, rate_from_json)
+        to_usd = converters[currency, raw_rate]
+        amount_usd = to_usd(amount)
+        charge_usd = to_usd(charge)
         
         # Get recipient info
         recipient_name = None
@@ -629,17 +625,14 @@ def get_today_transactions(
 @app.get("/api/transactions/{transaction_id}", response_model=TransactionResponse)
 def get_transaction(transaction_id: str, db: Session = Depends(get_db)):
     """Get a specific transaction by ID"""
-    transaction = db.query(TransactionCache).filter(TransactionCache.id == transaction_id).first()
+    transaction = db.query(TransactionCache).options(TRANSACTION_RESPONSE_COLUMNS).filter(
+        TransactionCache.id == transaction_id
+    ).first()
     
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    return TransactionResponse(
-        **{k: v for k, v in transaction.__dict__.items() if k not in ['_sa_instance_state', 'recipient', 'human_readable_amount', 'human_readable_charge']},
-        recipient=RecipientData(**transaction.recipient) if transaction.recipient else None,
-        human_readable_amount=format_currency(transaction.human_readable_amount),
-        human_readable_charge=format_currency(transaction.human_readable_charge)
-    )
+    return TransactionResponse.model_validate(transaction)
 
 @app.get("/api/analytics/custom-range", response_model=PeriodStats)
 def get_custom_range_analytics(
@@ -671,9 +664,7 @@ def get_custom_range_analytics(
         start_dt = parse_datetime(start_date)
         
         # Parse end date
-        end_dt = parse_datetime(end_date)
-        if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
-            end_dt = end_dt.replace(hour=23, minute=59, second=59)
+        end_dt = parse_range_end(end_date)
         
         # Validate date range
         if start_dt > end_dt:
@@ -723,9 +714,7 @@ def get_status_breakdown(
             
             if end_date:
                 end_dt = parse_datetime(end_date)
-                if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(TransactionCache.created_at <= end_dt)
+                query = query.filter(TransactionCache.created_at < exclusive_end(end_dt))
         except ValueError as e:
             raise HTTPException(
                 status_code=400,
@@ -736,21 +725,19 @@ def get_status_breakdown(
         query = query.filter(
             and_(
                 TransactionCache.created_at >= start,
-                TransactionCache.created_at <= end
+                TransactionCache.created_at < exclusive_end(end)
             )
         )
     
-    # Get total count
-    total_count = query.count()
-    
-    # Get count by status
-    status_counts = db.query(
+    # Get count by status directly from the filtered query
+    status_counts = query.with_entities(
         TransactionCache.status,
         func.count(TransactionCache.id).label('count')
-    ).filter(
-        TransactionCache.id.in_(query.with_entities(TransactionCache.id))
     ).group_by(TransactionCache.status).all()
     
+    # Total count is the sum of the groups, no second scan needed
+    total_count = sum(count for _, count in status_counts)
+    
     # Build status breakdown
     statuses = {}
     for status, count in status_counts:
@@ -771,6 +758,35 @@ def get_status_breakdown(
         statuses=statuses
     )
 
+def currency_volume_breakdown(query, limit: Optional[int] = None) -> List[CurrencyVolumeBreakdown]:
+    """
+    Build per-currency volume rows for a filtered transaction query, sorted by USD volume.
+    
+    Totals come from a single GROUP BY currency query. Amounts stay Decimal
+    until the response is serialized, so only returned rows are formatted.
+    """
+    currency_totals = usd_totals_by(query, (CURRENCY,))
+    total_volume_usd_all = sum((totals.volume_usd for totals in currency_totals.values()), Decimal(0))
+    
+    result = []
+    for (currency,), totals in currency_totals.items():
+        avg_transaction = totals.volume / totals.count if totals.count > 0 else Decimal(0)
+        percentage = (totals.volume_usd / total_volume_usd_all * 100) if total_volume_usd_all > 0 else 0
+        
+        result.append(CurrencyVolumeBreakdown(
+            currency=currency,
+            transaction_count=totals.count,
+            total_volume=totals.volume,
+            total_volume_usd=totals.volume_usd,
+            avg_transaction_size=avg_transaction,
+            percentage_of_total=format_percentage(percentage)
+        ))
+    
+    # Sort by USD volume (descending)
+    result.sort(key=lambda x: x.total_volume_usd, reverse=True)
+    
+    return result if limit is None else result[:limit]
+
 @app.get("/api/analytics/currency-breakdown", response_model=List[CurrencyVolumeBreakdown])
 def get_currency_breakdown(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)"),
@@ -815,9 +831,7 @@ def get_currency_breakdown(
             
             if end_date:
                 end_dt = parse_datetime(end_date)
-                if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(TransactionCache.created_at <= end_dt)
+                query = query.filter(TransactionCache.created_at < exclusive_end(end_dt))
         except ValueError as e:
             raise HTTPException(
                 status_code=400,
@@ -828,62 +842,11 @@ def get_currency_breakdown(
         query = query.filter(
             and_(
                 TransactionCache.created_at >= start,
-                TransactionCache.created_at <= end
+                TransactionCache.created_at < exclusive_end(end)
             )
         )
     
-    # Get all transactions for this query
-    transactions = query.all()
-    
-    # Calculate totals by currency
-    currency_data = {}
-    total_volume_usd_all = Decimal(0)
-    
-    for txn in transactions:
-        currency = txn.currency or "USD"
-        amount = txn.human_readable_amount or Decimal(0)
-        
-        # Convert to USD
-        rate_from_json = None
-        if txn.recipient and isinstance(txn.recipient, dict) and 'rate' in txn.recipient:
-            try:
-                rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-            except:
-                rate_from_json = None
-        
-        amount_usd = convert_to_usd(amount, currency, rate_from_json)
-        total_volume_usd_all += amount_usd
-        
-        if currency not in currency_data:
-            currency_data[currency] = {
-                "count": 0,
-                "total_volume": Decimal(0),
-                "total_volume_usd": Decimal(0)
-            }
-        
-        currency_data[currency]["count"] += 1
-        currency_data[currency]["total_volume"] += amount
-        currency_data[currency]["total_volume_usd"] += amount_usd
-    
-    # Build response
-    result = []
-    for currency, data in currency_data.items():
-        avg_transaction = data["total_volume"] / data["count"] if data["count"] > 0 else Decimal(0)
-        percentage = (data["total_volume_usd"] / total_volume_usd_all * 100) if total_volume_usd_all > 0 else 0
-        
-        result.append(CurrencyVolumeBreakdown(
-            currency=currency,
-            transaction_count=data["count"],
-            total_volume=format_currency(data["total_volume"]),
-            total_volume_usd=format_currency(data["total_volume_usd"]),
-            avg_transaction_size=format_currency(avg_transaction),
-            percentage_of_total=format_percentage(percentage)
-        ))
-    
-    # Sort by volume (descending)
-    result.sort(key=lambda x: x.total_volume_usd, reverse=True)
-    
-    return result
+    return currency_volume_breakdown(query)
 
 @app.get("/api/analytics/top-currencies", response_model=List[CurrencyVolumeBreakdown])
 def get_top_currencies(
@@ -963,9 +926,7 @@ def get_top_currencies(
             
             if end_date:
                 end_dt = parse_datetime(end_date)
-                if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(TransactionCache.created_at <= end_dt)
+                query = query.filter(TransactionCache.created_at < exclusive_end(end_dt))
         except ValueError as e:
             raise HTTPException(
                 status_code=400,
@@ -976,7 +937,7 @@ def get_top_currencies(
         query = query.filter(
             and_(
                 TransactionCache.created_at >= period_start_dt,
-                TransactionCache.created_at <= period_end_dt
+                TransactionCache.created_at < exclusive_end(period_end_dt)
             )
         )
     elif interval:
@@ -984,64 +945,15 @@ def get_top_currencies(
         query = query.filter(
             and_(
                 TransactionCache.created_at >= start,
-                TransactionCache.created_at <= end
+                TransactionCache.created_at < exclusive_end(end)
             )
         )
     
-    # Get all transactions for this query
-    transactions = query.all()
-    
-    # Calculate totals by currency
-    currency_data = {}
-    total_volume_usd_all = Decimal(0)
-    
-    for txn in transactions:
-        currency = txn.currency or "USD"
-        amount = txn.human_readable_amount or Decimal(0)
-        
-        # Convert to USD
-        rate_from_json = None
-        if txn.recipient and isinstance(txn.recipient, dict) and 'rate' in txn.recipient:
-            try:
-                rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-            except:
-                rate_from_json = None
-        
-        amount_usd = convert_to_usd(amount, currency, rate_from_json)
-        total_volume_usd_all += amount_usd
-        
-        if currency not in currency_data:
-            currency_data[currency] = {
-                "count": 0,
-                "total_volume": Decimal(0),
-                "total_volume_usd": Decimal(0)
-            }
-        
-        currency_data[currency]["count"] += 1
-        currency_data[currency]["total_volume"] += amount
-        currency_data[currency]["total_volume_usd"] += amount_usd
-    
-    # Build response - Top 5 only
-    result = []
-    for currency, data in currency_data.items():
-        avg_transaction = data["total_volume"] / data["count"] if data["count"] > 0 else Decimal(0)
-        percentage = (data["total_volume_usd"] / total_volume_usd_all * 100) if total_volume_usd_all > 0 else 0
-        
-        result.append(CurrencyVolumeBreakdown(
-            currency=currency,
-            transaction_count=data["count"],
-            total_volume=format_currency(data["total_volume"]),
-            total_volume_usd=format_currency(data["total_volume_usd"]),
-            avg_transaction_size=format_currency(avg_transaction),
-            percentage_of_total=format_percentage(percentage)
-        ))
-    
-    # Sort by USD volume (descending) and take top 5
-    result.sort(key=lambda x: float(x.total_volume_usd.replace('$', '').replace(',', '')), reverse=True)
-    
-    return result[:5]  # Return only top 5
+    # Top 5 only
+    return currency_volume_breakdown(query, limit=5)
 
 @app.get("/api/analytics/transaction-overview", response_model=TransactionOverview)
+@cached_response(OVERVIEW_CACHE_SECONDS)
 def get_transaction_overview(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)"),
@@ -1105,9 +1017,7 @@ def get_transaction_overview(
             
             if end_date:
                 end_dt = parse_datetime(end_date)
-                if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(TransactionCache.created_at <= end_dt)
+                query = query.filter(TransactionCache.created_at < exclusive_end(end_dt))
         except ValueError as e:
             raise HTTPException(
                 status_code=400,
@@ -1118,7 +1028,7 @@ def get_transaction_overview(
         query = query.filter(
             and_(
                 TransactionCache.created_at >= period_start_dt,
-                TransactionCache.created_at <= period_end_dt
+                TransactionCache.created_at < exclusive_end(period_end_dt)
             )
         )
     elif interval:
@@ -1126,61 +1036,28 @@ def get_transaction_overview(
         query = query.filter(
             and_(
                 TransactionCache.created_at >= start,
-                TransactionCache.created_at <= end
+                TransactionCache.created_at < exclusive_end(end)
             )
         )
     
-    # Get all transactions
-    all_transactions = query.all()
-    total_count = len(all_transactions)
-    
-    # Calculate metrics by status
-    status_metrics = {}
-    total_volume_usd = Decimal(0)
-    total_revenue_usd = Decimal(0)
-    success_count = 0
+    # Count and USD volume/revenue per status, grouped in SQL and converted once per group
+    status_key = func.coalesce(TransactionCache.status, "unknown")
+    status_totals = {status: totals for (status,), totals in usd_totals_by(query, (status_key,)).items()}
     
-    for txn in all_transactions:
-        status = txn.status or "unknown"
-        amount = txn.human_readable_amount or Decimal(0)
-        charge = txn.human_readable_charge or Decimal(0)
-        currency = txn.currency or "USD"
-        
-        # Convert to USD
-        rate_from_json = None
-        if txn.recipient and isinstance(txn.recipient, dict) and 'rate' in txn.recipient:
-            try:
-                rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-            except:
-                rate_from_json = None
-        
-        amount_usd = convert_to_usd(amount, currency, rate_from_json)
-        charge_usd = convert_to_usd(charge, currency, rate_from_json)
-        
-        if status not in status_metrics:
-            status_metrics[status] = {
-                "count": 0,
-                "volume_usd": Decimal(0),
-                "revenue_usd": Decimal(0)
-            }
-        
-        status_metrics[status]["count"] += 1
-        status_metrics[status]["volume_usd"] += amount_usd
-        status_metrics[status]["revenue_usd"] += charge_usd
-        
-        if status == "success":
-            success_count += 1
-            total_volume_usd += amount_usd
-            total_revenue_usd += charge_usd
+    total_count = sum(totals.count for totals in status_totals.values())
+    success = status_totals.get("success", EMPTY_TOTALS)
+    success_count = success.count
+    total_volume_usd = success.volume_usd
+    total_revenue_usd = success.revenue_usd
     
     # Build status breakdown
     status_breakdown = {}
-    for status, metrics in status_metrics.items():
-        percentage = (metrics["count"] / total_count * 100) if total_count > 0 else 0
+    for status, totals in status_totals.items():
+        percentage = (totals.count / total_count * 100) if total_count > 0 else 0
         status_breakdown[status] = {
-            "count": metrics["count"],
-            "volume_usd": format_currency(metrics["volume_usd"]),
-            "revenue_usd": format_currency(metrics["revenue_usd"]),
+            "count": totals.count,
+            "volume_usd": format_currency(totals.volume_usd),
+            "revenue_usd": format_currency(totals.revenue_usd),
             "percentage": format_percentage(percentage)
         }
     
@@ -1216,7 +1093,9 @@ def get_transactions_by_status(
     - YYYY-MM-DD (e.g., 2024-01-15)
     - YYYY-MM-DD HH:MM:SS (e.g., 2024-01-15 14:30:00)
     """
-    query = db.query(TransactionCache).filter(TransactionCache.status == status)
+    query = db.query(TransactionCache).options(TRANSACTION_RESPONSE_COLUMNS).filter(
+        TransactionCache.status == status
+    )
     
     # Apply date filters if provided
     if start_date or end_date:
@@ -1227,25 +1106,16 @@ def get_transactions_by_status(
             
             if end_date:
                 end_dt = parse_datetime(end_date)
-                if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(TransactionCache.created_at <= end_dt)
+                query = query.filter(TransactionCache.created_at < exclusive_end(end_dt))
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
     
     transactions = query.order_by(desc(TransactionCache.created_at)).offset(skip).limit(limit).all()
     
-    return [
-        TransactionResponse(
-            **{k: v for k, v in t.__dict__.items() if k not in ['_sa_instance_state', 'recipient', 'human_readable_amount', 'human_readable_charge']},
-            recipient=RecipientData(**t.recipient) if t.recipient else None,
-            human_readable_amount=format_currency(t.human_readable_amount),
-            human_readable_charge=format_currency(t.human_readable_charge)
-        )
-        for t in transactions
-    ]
+    return [TransactionResponse.model_validate(t) for t in transactions]
 
 @app.get("/api/analytics/daily-trend", response_model=TransactionTrend)
+@cached_response(DAILY_TREND_CACHE_SECONDS)
 def get_daily_transaction_trend(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)"),
@@ -1288,9 +1158,7 @@ def get_daily_transaction_trend(
                 start_dt = datetime(2025, 7, 18, 0, 0, 0)
             
             if end_date:
-                end_dt = parse_datetime(end_date)
-                if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
-                    end_dt = end_dt.replace(hour=23, minute=59, second=59)
+                end_dt = parse_range_end(end_date)
             else:
                 end_dt = now
         except ValueError as e:
@@ -1309,100 +1177,39 @@ def get_daily_transaction_trend(
             detail="start_date must be before or equal to end_date"
         )
     
-    # Use database aggregation for counts, but we need individual records for currency conversion
-    # Group by date and status for counts (efficient)
-    from sqlalchemy import case
-    
-    daily_counts = db.query(
-        func.date(TransactionCache.created_at).label('date'),
-        TransactionCache.status,
-        func.count(TransactionCache.id).label('count')
-    ).filter(
+    # Counts and USD sums per day and status in one scan of the range, grouped in SQL by
+    # day, status, currency and JSON rate so only one row per group is converted
+    by_day_and_status = daily_status_totals(db.query(TransactionCache).filter(
         and_(
             TransactionCache.created_at >= start_dt,
-            TransactionCache.created_at <= end_dt
+            TransactionCache.created_at < exclusive_end(end_dt)
         )
-    ).group_by(
-        func.date(TransactionCache.created_at),
-        TransactionCache.status
-    ).all()
-    
-    # For successful transactions, we need to fetch and convert to USD
-    # Only fetch successful transactions to minimize data transfer
-    success_transactions = db.query(
-        func.date(TransactionCache.created_at).label('date'),
-        TransactionCache.human_readable_amount,
-        TransactionCache.human_readable_charge,
-        TransactionCache.currency,
-        TransactionCache.recipient
-    ).filter(
-        and_(
-            TransactionCache.created_at >= start_dt,
-            TransactionCache.created_at <= end_dt,
-            TransactionCache.status == "success"
-        )
-    ).all()
+    ))
     
     # Group results by date
-    daily_data_dict = {}
-    
-    # First, populate counts from aggregated query
-    for row in daily_counts:
-        date_str = row.date.isoformat()
-        
-        if date_str not in daily_data_dict:
-            daily_data_dict[date_str] = {
-                "transaction_count": 0,
-                "success_count": 0,
-                "failed_count": 0,
-                "pending_count": 0,
-                "total_volume_usd": Decimal(0),
-                "total_revenue_usd": Decimal(0)
-            }
+    daily_data_dict = defaultdict(lambda: {
+        "transaction_count": 0,
+        "success_count": 0,
+        "failed_count": 0,
+        "pending_count": 0,
+        "total_volume_usd": _ZERO,
+        "total_revenue_usd": _ZERO
+    })
+    
+    for (day, status), totals in by_day_and_status.items():
+        data = daily_data_dict[day.isoformat()]
         
         # Aggregate counts by status
-        daily_data_dict[date_str]["transaction_count"] += row.count
-        
-        if row.status == "success":
-            daily_data_dict[date_str]["success_count"] += row.count
-        elif row.status in ["failed", "declined", "reversed"]:
-            daily_data_dict[date_str]["failed_count"] += row.count
-        elif row.status == "pending":
-            daily_data_dict[date_str]["pending_count"] += row.count
-    
-    # Now convert and sum amounts for successful transactions
-    for row in success_transactions:
-        date_str = row.date.isoformat()
+        data["transaction_count"] += totals.count
         
-        # Ensure date exists in dict (should already exist from counts)
-        if date_str not in daily_data_dict:
-            daily_data_dict[date_str] = {
-                "transaction_count": 0,
-                "success_count": 0,
-                "failed_count": 0,
-                "pending_count": 0,
-                "total_volume_usd": Decimal(0),
-                "total_revenue_usd": Decimal(0)
-            }
+        bucket = STATUS_BUCKET.get(status)
+        if bucket:
+            data[bucket] += totals.count
         
-        amount = row.human_readable_amount or Decimal(0)
-        charge = row.human_readable_charge or Decimal(0)
-        currency = row.currency or "USD"
-        
-        # Get rate from recipient JSON
-        rate_from_json = None
-        if row.recipient and isinstance(row.recipient, dict) and 'rate' in row.recipient:
-            try:
-                rate_from_json = Decimal(str(row.recipient['rate'])) if row.recipient['rate'] else None
-            except:
-                rate_from_json = None
-        
-        # Convert to USD
-        amount_usd = convert_to_usd(amount, currency, rate_from_json)
-        charge_usd = convert_to_usd(charge, currency, rate_from_json)
-        
-        daily_data_dict[date_str]["total_volume_usd"] += amount_usd
-        daily_data_dict[date_str]["total_revenue_usd"] += charge_usd
+        # Volume and revenue only count successful transactions
+        if status == "success":
+            data["total_volume_usd"] += totals.volume_usd
+            data["total_revenue_usd"] += totals.revenue_usd
     
     # Build daily data list
     daily_data = []
@@ -1554,14 +1361,12 @@ def send_weekly_performance_email(
     subject = f"Weekly Transaction Performance Report - {start_date} to {end_date}"
     
     # Generate email content
-    html_content = generate_html_email(report_data)
-    plain_text_content = generate_plain_text_email(report_data)
+    html_content, plain_text_content = render_both(report_data)
     
     # Email sending using Gmail API
-    from os import getenv
-    sender_email = getenv("WEEKLY_REPORT_SENDER_EMAIL", None)
+    sender_email = get_settings().weekly_report_sender_email
     
-    # Send email using Gmail API (uses credentials.json and token.pickle)
+    # Send email using Gmail API (uses credentials.json and token.json)
     success = send_email(
         recipients=request.recipients,
         subject=subject,
@@ -1592,5 +1397,5 @@ def send_weekly_performance_email(
 
 if __name__ == "__main__":
     import uvicorn
-    from app.config import settings
+    settings = get_settings()
     uvicorn.run(app, host=settings.api_host, port=settings.api_port)
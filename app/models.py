@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, BigInteger, Numeric, Text, DateTime, Enum, JSON, Integer, TIMESTAMP
+from sqlalchemy import Column, String, BigInteger, Numeric, Text, DateTime, Enum, JSON, Integer, TIMESTAMP, Index
 from sqlalchemy.sql import func
+from sqlalchemy.orm import deferred
 from app.database import Base
 import enum
 
@@ -35,6 +36,14 @@ class TransactionCache(Base):
     Synced periodically to maintain a local copy of global transactions
     """
     __tablename__ = "transaction_cache"
+    __table_args__ = (
+        # Status-filtered windows (status = 'success', status IN (...errors)) over created_at
+        Index("ix_transaction_cache_status_created_at", "status", "created_at"),
+        # Covers the COUNT(DISTINCT from_wallet) active user counts over created_at
+        Index("ix_transaction_cache_created_at_from_wallet", "created_at", "from_wallet"),
+        # Covers the per-day status counts over a created_at range (daily trend, status breakdown)
+        Index("ix_transaction_cache_created_at_status", "created_at", "status"),
+    )
     
     id = Column(String(40), primary_key=True)  # UUID from external API
     amount = Column(Integer, nullable=False)
@@ -49,7 +58,8 @@ class TransactionCache(Base):
     external_id = Column(String(100), nullable=True)
     currency = Column(String(3), nullable=True)
     created_at = Column(DateTime, nullable=True)
-    recipient = Column(JSON, nullable=True)
+    # Deferred: only the endpoints that return it name it in their load_only
+    recipient = deferred(Column(JSON, nullable=True))
     # Wallet swap fields
     from_wallet = Column(String(10), nullable=True)
     to_wallet = Column(String(10), nullable=True)
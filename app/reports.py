@@ -10,8 +10,9 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Any
 from app.models import TransactionCache
-from app.currency_rates import convert_to_usd
+from app.aggregates import CURRENCY, usd_totals_by
 from app.formatters import format_currency, format_percentage
+from app.utils import exclusive_end
 
 
 def get_week_boundaries(week_start_date: str) -> tuple[datetime, datetime]:
@@ -47,75 +48,45 @@ def calculate_week_metrics(db: Session, start: datetime, end: datetime) -> Dict[
     base_query = db.query(TransactionCache).filter(
         and_(
             TransactionCache.created_at >= start,
-            TransactionCache.created_at <= end
+            TransactionCache.created_at < exclusive_end(end)
         )
     )
     
-    # Get all transactions
-    all_transactions = base_query.all()
-    total_transactions = len(all_transactions)
+    # Totals per status and currency, with the JSON rate extracted in SQL
+    totals_by_status_currency = usd_totals_by(base_query, (TransactionCache.status, CURRENCY))
     
     # Initialize counters
-    success_count = 0
-    failed_count = 0
-    pending_count = 0
-    declined_count = 0
-    reversed_count = 0
-    processing_swap_count = 0
-    other_count = 0
-    
+    status_counts = {}
     total_volume_usd = Decimal(0)
     total_revenue_usd = Decimal(0)
     currency_breakdown = {}
     
-    # Process each transaction
-    for txn in all_transactions:
+    for (status, currency), totals in totals_by_status_currency.items():
         # Count by status
-        if txn.status == "success":
-            success_count += 1
-        elif txn.status == "failed":
-            failed_count += 1
-        elif txn.status == "pending":
-            pending_count += 1
-        elif txn.status == "declined":
-            declined_count += 1
-        elif txn.status == "reversed":
-            reversed_count += 1
-        elif txn.status == "processing_swap":
-            processing_swap_count += 1
-        else:
-            other_count += 1
+        status_counts[status] = status_counts.get(status, 0) + totals.count
         
         # Calculate volumes (only for successful transactions)
-        if txn.status == "success":
-            amount = txn.human_readable_amount or Decimal(0)
-            charge = txn.human_readable_charge or Decimal(0)
-            currency = txn.currency or "USD"
-            
-            # Get rate from recipient JSON
-            rate_from_json = None
-            if txn.recipient and isinstance(txn.recipient, dict) and 'rate' in txn.recipient:
-                try:
-                    rate_from_json = Decimal(str(txn.recipient['rate'])) if txn.recipient['rate'] else None
-                except:
-                    rate_from_json = None
-            
-            # Convert to USD
-            amount_usd = convert_to_usd(amount, currency, rate_from_json)
-            charge_usd = convert_to_usd(charge, currency, rate_from_json)
-            
-            total_volume_usd += amount_usd
-            total_revenue_usd += charge_usd
+        if status == "success":
+            total_volume_usd += totals.volume_usd
+            total_revenue_usd += totals.revenue_usd
             
             # Track currency breakdown
-            if currency not in currency_breakdown:
-                currency_breakdown[currency] = {
-                    "transaction_count": 0,
-                    "volume_usd": Decimal(0)
-                }
-            
-            currency_breakdown[currency]["transaction_count"] += 1
-            currency_breakdown[currency]["volume_usd"] += amount_usd
+            currency_breakdown[currency] = {
+                "transaction_count": totals.count,
+                "volume_usd": totals.volume_usd
+            }
+    
+    total_transactions = sum(status_counts.values())
+    success_count = status_counts.get("success", 0)
+    failed_count = status_counts.get("failed", 0)
+    pending_count = status_counts.get("pending", 0)
+    declined_count = status_counts.get("declined", 0)
+    reversed_count = status_counts.get("reversed", 0)
+    processing_swap_count = status_counts.get("processing_swap", 0)
+    other_count = total_transactions - (
+        success_count + failed_count + pending_count
+        + declined_count + reversed_count + processing_swap_count
+    )
     
     # Calculate percentages
     success_percentage = (success_count / total_transactions * 100) if total_transactions > 0 else 0
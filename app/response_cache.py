@@ -0,0 +1,193 @@
+"""
+Response Cache Module
+
+Short-lived in-process cache for dashboard endpoints that are polled every few
+seconds and for the heavier analytics aggregations, so repeated requests inside
+the TTL skip the database entirely, plus ETag/Cache-Control headers so clients
+can skip downloading unchanged responses.
+"""
+
+import hashlib
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+
+class TTLCache:
+    """
+    Values that expire ttl seconds after they were computed.
+
+    Concurrent misses for the same key wait for a single computation instead
+    of all hitting the database. Once max_entries values are stored, expired
+    ones are dropped before adding another (all of them if none have expired).
+    A value whose computation overlapped a clear() is returned but not stored.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._generation = 0    # bumped by clear()
+
+    def _fresh(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry
+        return None
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it if missing or expired."""
+        entry = self._fresh(key)
+        if entry is not None:
+            return entry[1]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another request may have filled it while we waited
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[1]
+
+            with self._lock:
+                generation = self._generation
+            stored = False
+            try:
+                value = compute()
+                with self._lock:
+                    if self._generation == generation:
+                        if len(self._entries) >= self.max_entries:
+                            self._prune()
+                        self._entries[key] = (time.monotonic() + self.ttl, value)
+                        stored = True
+                return value
+            finally:
+                # Keys whose compute failed or was not stored (e.g. invalid
+                # query parameters) would otherwise keep their lock forever
+                if not stored:
+                    with self._lock:
+                        self._key_locks.pop(key, None)
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key, (expires, _) in list(self._entries.items()):
+            if expires <= now:
+                del self._entries[key]
+                self._key_locks.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+            self._key_locks.clear()
+
+    def clear(self) -> None:
+        """Drop all cached values."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._key_locks.clear()
+
+
+# Every cache created by cached_response, so writes can drop them all
+_response_caches: List[TTLCache] = []
+
+
+def clear_response_caches() -> None:
+    """Drop every cached endpoint response, e.g. after new transactions are synced."""
+    for cache in _response_caches:
+        cache.clear()
+
+
+def cached_response(ttl_seconds: float):
+    """
+    Cache an endpoint's response for ttl_seconds.
+
+    Responses are keyed by the endpoint's query parameters, i.e. its keyword
+    arguments other than the db session, so endpoints whose only parameter is
+    the session share one cache entry. The cache is exposed as .cache on the
+    wrapped function.
+    """
+    def decorator(func):
+        cache = TTLCache(ttl_seconds)
+        _response_caches.append(cache)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__,) + tuple(
+                (name, value) for name, value in sorted(kwargs.items()) if name != "db"
+            )
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+class ETagMiddleware:
+    """
+    ASGI middleware adding ETag and Cache-Control headers to successful GET
+    responses under the given path prefixes.
+    
+    The ETag is a hash of the response body. When the request's If-None-Match
+    already names it, the body is replaced by an empty 304 Not Modified.
+    """
+    
+    def __init__(self, app, path_prefixes: Sequence[str], max_age: int):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.cache_control = f"max-age={max_age}".encode()
+    
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value
+        
+        start = None
+        body = []
+        
+        async def send_with_etag(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] != 200:
+                    await send(message)
+                return
+            
+            if start["status"] != 200:
+                await send(message)
+                return
+            
+            body.append(message.get("body", b""))
+            if message.get("more_body"):
+                return
+            
+            content = b"".join(body)
+            etag = b'"' + hashlib.sha1(content).hexdigest().encode() + b'"'
+            headers = [
+                (name, value) for name, value in start["headers"]
+                if name not in (b"content-length", b"etag", b"cache-control")
+            ]
+            headers += [(b"etag", etag), (b"cache-control", self.cache_control)]
+            
+            if if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(b",")):
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            
+            headers.append((b"content-length", str(len(content)).encode()))
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": content})
+        
+        await self.app(scope, receive, send_with_etag)
@@ -1,10 +1,15 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, PlainSerializer, field_validator
 from typing import Optional, List, Dict
+from typing_extensions import Annotated
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
 from typing import Any
+from app.formatters import format_currency
 
+# Amount kept as a Decimal (so it sorts and adds numerically) and only
+# formatted as a currency string when the model is serialized
+FormattedMoney = Annotated[Decimal, PlainSerializer(format_currency, return_type=str)]
 class TimeInterval(str, Enum):
     TODAY = "today"
     PREVIOUS_DAY = "previous_day"
@@ -59,8 +64,18 @@ class TransactionResponse(BaseModel):
     created_at: datetime
     recipient: Optional[RecipientData]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+    
+    @field_validator("human_readable_amount", "human_readable_charge", mode="before")
+    @classmethod
+    def format_amount(cls, value):
+        # Raw Decimal columns are formatted, so model_validate(transaction) works directly
+        return value if isinstance(value, str) else format_currency(value)
+    
+    @field_validator("recipient", mode="before")
+    @classmethod
+    def empty_recipient(cls, value):
+        return value or None
 
 class PeriodStats(BaseModel):
     period_name: str
@@ -81,6 +96,7 @@ class TransactionsLiveView(BaseModel):
     current_month: PeriodStats
     previous_month: PeriodStats
     year_to_date: PeriodStats
+    staleness_seconds: float = 0.0  # Age of the oldest cached day totals used; today's are cached up to 5 minutes
 
 class TransactionPulse(BaseModel):
     transactions_per_minute: float
@@ -126,9 +142,9 @@ class TransactionStatusBreakdown(BaseModel):
 class CurrencyVolumeBreakdown(BaseModel):
     currency: str
     transaction_count: int
-    total_volume: str  # Changed to string for formatted output
-    total_volume_usd: str  # Changed to string for formatted output
-    avg_transaction_size: str  # Changed to string for formatted output
+    total_volume: FormattedMoney
+    total_volume_usd: FormattedMoney
+    avg_transaction_size: FormattedMoney
     percentage_of_total: float
 
 class TransactionOverview(BaseModel):
@@ -14,7 +14,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy.dialects.mysql import insert
 from app.database import get_db
 from app.models import TransactionCache
-from app.config import settings
+from app.aggregates import daily_rollup
+from app.response_cache import clear_response_caches
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -232,6 +234,9 @@ class TransactionSyncService:
                 continue
         
         db.commit()
+        # Past days may have changed, so the live view re-aggregates them
+        daily_rollup.invalidate()
+        clear_response_caches()
         logger.info(f"Sync complete: {inserted_count} inserted, {updated_count} updated")
         
         return {
@@ -314,5 +319,5 @@ def get_sync_service() -> TransactionSyncService:
     """Get or create the transaction sync service singleton"""
     global _sync_service
     if _sync_service is None:
-        _sync_service = TransactionSyncService(settings.global_transaction_api_key)
+        _sync_service = TransactionSyncService(get_settings().global_transaction_api_key)
     return _sync_service
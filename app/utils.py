@@ -1,6 +1,8 @@
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from functools import lru_cache
 from typing import Tuple
 
+@lru_cache(maxsize=512)
 def parse_datetime(date_string: str) -> datetime:
     """
     Parse datetime string in multiple formats.
@@ -39,6 +41,28 @@ def parse_datetime(date_string: str) -> datetime:
             "Supported formats: YYYY-MM-DD, YYYY-MM-DD HH:MM:SS, or ISO 8601 (2025-12-31T21:00:00.000Z)"
         )
 
+def parse_range_end(date_string: str) -> datetime:
+    """
+    Parse an inclusive range end. A date without a time (midnight) means the
+    end of that day, 23:59:59.
+    """
+    end = parse_datetime(date_string)
+    if end.hour == 0 and end.minute == 0 and end.second == 0:
+        end = end.replace(hour=23, minute=59, second=59)
+    return end
+
+def exclusive_end(end: datetime) -> datetime:
+    """
+    Turn an inclusive end datetime into an exclusive bound for `created_at < bound` filters.
+    
+    A bare date (midnight) covers that whole day, so it becomes the next midnight.
+    Any other time covers its whole second, so range ends like 23:59:59.999999
+    also become the next midnight.
+    """
+    if end.time() == time.min:
+        return end + timedelta(days=1)
+    return end.replace(microsecond=0) + timedelta(seconds=1)
+
 def get_today_range() -> Tuple[datetime, datetime]:
     """Get today's date range (00:00 to 23:59:59)"""
     now = datetime.now()
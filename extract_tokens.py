@@ -2,7 +2,7 @@
 """
 Extract OAuth2 tokens for server deployment.
 
-This script reads your local token.pickle file and extracts the necessary
+This script reads your local token.json file and extracts the necessary
 tokens for server deployment. Run this locally, then set the environment
 variables on your server.
 
@@ -10,13 +10,14 @@ Usage:
     python extract_tokens.py
 """
 
-import pickle
 import os
 
+from google.oauth2.credentials import Credentials
+
 def extract_tokens():
-    """Extract tokens from token.pickle for server deployment."""
+    """Extract tokens from token.json for server deployment."""
     
-    token_file = 'token.pickle'
+    token_file = 'token.json'
     
     if not os.path.exists(token_file):
         print(f"❌ {token_file} not found!")
@@ -24,8 +25,7 @@ def extract_tokens():
         return
     
     try:
-        with open(token_file, 'rb') as token:
-            creds = pickle.load(token)
+        creds = Credentials.from_authorized_user_file(token_file)
         
         print("🔐 OAuth2 Tokens for Server Deployment")
         print("=" * 50)
@@ -43,7 +43,7 @@ def authenticate():
             print("\n" + "="*60)
             print("✅ SUCCESS! Gmail API is configured and ready to use.")
             print("="*60)
-            print("\nA token.pickle file has been created.")
+            print("\nA token.json file has been created.")
             print("This file stores your authentication token.")
             
             # Offer to send test email
@@ -0,0 +1,192 @@
+"""
+Tests for SQL-side USD aggregation
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import TransactionCache
+from app.currency_rates import convert_to_usd
+from app.aggregates import (
+    CURRENCY, DailyRollup, daily_status_totals, parse_json_rate, usd_totals, usd_totals_by
+)
+
+ROWS = [
+    ("NGN", "success", "1433.62", "14.34", {"rate": 1433.62}),
+    ("NGN", "success", "2867.24", "28.67", {"rate": 1433.62}),
+    ("NGN", "success", "1000.00", "10.00", {"rate": "bad"}),
+    ("EUR", "success", "85.00", "1.00", {"rate": 0.85}),
+    ("EUR", "success", "85.00", None, {"rate": 1.18}),
+    ("KES", "success", "125.30", "1.25", None),
+    (None, "success", "10.00", "0.50", {"country": "US"}),
+    ("", "success", "5.00", None, {"rate": None}),
+    ("USD", "failed", "99.00", "1.00", None),
+]
+
+
+def make_session(created_at=None):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    for i, (currency, status, amount, charge, recipient) in enumerate(ROWS):
+        db.add(TransactionCache(
+            id=str(i),
+            created_at=created_at,
+            amount=0,
+            human_readable_amount=Decimal(amount),
+            human_readable_charge=Decimal(charge) if charge else None,
+            currency=currency,
+            status=status,
+            recipient=recipient,
+        ))
+    db.commit()
+    return db
+
+
+def expected(rows):
+    volume_usd = revenue_usd = Decimal(0)
+    for currency, _, amount, charge, recipient in rows:
+        rate = parse_json_rate((recipient or {}).get("rate"))
+        volume_usd += convert_to_usd(Decimal(amount), currency or "USD", rate)
+        revenue_usd += convert_to_usd(Decimal(charge or 0), currency or "USD", rate)
+    return volume_usd, revenue_usd
+
+
+def test_parse_json_rate():
+    assert parse_json_rate("1433.62") == Decimal("1433.62")
+    assert parse_json_rate(0.85) == Decimal("0.85")
+    assert parse_json_rate(None) is None
+    assert parse_json_rate("") is None
+    assert parse_json_rate("null") is None
+
+
+def test_usd_totals_match_row_by_row_conversion():
+    db = make_session()
+    success_rows = [row for row in ROWS if row[1] == "success"]
+    volume_usd, revenue_usd = expected(success_rows)
+
+    totals = usd_totals(db.query(TransactionCache).filter(TransactionCache.status == "success"))
+
+    assert totals.count == len(success_rows)
+    assert abs(totals.volume_usd - volume_usd) < Decimal("0.000001")
+    assert abs(totals.revenue_usd - revenue_usd) < Decimal("0.000001")
+
+
+def test_usd_totals_by_currency():
+    db = make_session()
+    totals = usd_totals_by(
+        db.query(TransactionCache).filter(TransactionCache.status == "success"), (CURRENCY,)
+    )
+
+    # Missing and empty currency codes are grouped as USD
+    assert set(totals) == {("NGN",), ("EUR",), ("KES",), ("USD",)}
+    assert totals[("NGN",)].count == 3
+    assert totals[("NGN",)].volume == Decimal("5300.86")
+    assert totals[("USD",)].volume_usd == Decimal("15.00")
+    assert usd_totals(db.query(TransactionCache).filter(TransactionCache.status == "pending")).count == 0
+
+
+def test_daily_status_totals():
+    created_at = datetime(2025, 3, 14, 9, 30)
+    db = make_session(created_at=created_at)
+    totals = daily_status_totals(db.query(TransactionCache))
+
+    day = created_at.date()
+    assert set(totals) == {(day, "success"), (day, "failed")}
+    assert totals[(day, "failed")].count == 1
+    volume_usd, revenue_usd = expected([row for row in ROWS if row[1] == "success"])
+    assert abs(totals[(day, "success")].volume_usd - volume_usd) < Decimal("0.000001")
+    assert abs(totals[(day, "success")].revenue_usd - revenue_usd) < Decimal("0.000001")
+
+
+def test_daily_rollup_periods():
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    yesterday = today - timedelta(days=1)
+    db = make_session(created_at=yesterday + timedelta(hours=12))
+    day_end = timedelta(hours=23, minutes=59, seconds=59, microseconds=999999)
+    ranges = {
+        "today": (today, today + day_end),
+        "previous_day": (yesterday, yesterday + day_end),
+        "both": (yesterday, today + day_end),
+    }
+    rollup = DailyRollup()
+
+    totals, _ = rollup.periods(db, ranges)
+    assert totals["today"].total_count == 0
+    assert totals["previous_day"].total_count == len(ROWS)
+    assert totals["previous_day"].error_count == 1
+    assert totals["both"] == totals["previous_day"]
+
+    # Past days are served from memory until invalidated
+    db.query(TransactionCache).filter(TransactionCache.status == "failed").delete()
+    db.commit()
+    assert rollup.periods(db, ranges)[0]["previous_day"].error_count == 1
+    rollup.invalidate()
+    assert rollup.periods(db, ranges)[0]["previous_day"].error_count == 0
+
+
+def test_daily_rollup_today_cached_until_invalidated():
+    db = make_session(created_at=datetime.now())
+    rollup = DailyRollup()
+
+    totals, _ = rollup.today(db)
+    assert totals.total_count == len(ROWS)
+    assert totals.error_count == 1
+
+    db.query(TransactionCache).filter(TransactionCache.status == "failed").delete()
+    db.commit()
+    assert rollup.today(db)[0].error_count == 1
+    rollup.invalidate()
+    assert rollup.today(db)[0].error_count == 0
+
+
+def test_daily_rollup_cold_periods_use_one_query():
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    db = make_session(created_at=today - timedelta(hours=12))
+    day_end = timedelta(hours=23, minutes=59, seconds=59, microseconds=999999)
+    ranges = {"week": (today - timedelta(days=6), today + day_end)}
+    rollup = DailyRollup()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    totals, _ = rollup.periods(db, ranges)
+    assert totals["week"].total_count == len(ROWS)
+    assert len(statements) == 1
+
+    # Both past days and today are cached now
+    rollup.periods(db, ranges)
+    rollup.today(db)
+    assert len(statements) == 1
+
+
+def test_daily_rollup_skips_store_when_invalidated_during_query(monkeypatch):
+    import app.aggregates as aggregates
+
+    db = make_session(created_at=datetime.now())
+    rollup = DailyRollup()
+    real_daily_totals = aggregates.daily_totals
+
+    def daily_totals_with_sync(query):
+        days = real_daily_totals(query)
+        rollup.invalidate()   # the sync commits and invalidates while this read is in flight
+        return days
+
+    monkeypatch.setattr(aggregates, "daily_totals", daily_totals_with_sync)
+    totals, _ = rollup.today(db)
+    assert totals.error_count == 1
+    monkeypatch.undo()
+
+    # The pre-sync totals were not cached, so the next read sees the change
+    db.query(TransactionCache).filter(TransactionCache.status == "failed").delete()
+    db.commit()
+    assert rollup.today(db)[0].error_count == 0
@@ -0,0 +1,84 @@
+"""
+Tests for USD conversion rate selection
+"""
+
+import os
+import sys
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.currency_rates import (
+    CURRENCY_RATES,
+    convert_to_usd,
+    convert_to_usd_cents,
+    get_usd_rate,
+    usd_converter,
+)
+
+
+def test_usd_and_empty_amounts():
+    assert convert_to_usd(Decimal("100"), "USD") == Decimal("100")
+    assert convert_to_usd(Decimal("100"), None) == Decimal("100")
+    assert convert_to_usd(Decimal("0"), "NGN") == Decimal("0")
+    assert convert_to_usd(None, "NGN") == Decimal("0")
+
+
+def test_predefined_rate_fallback():
+    amount = CURRENCY_RATES["NGN"]
+    assert abs(convert_to_usd(amount, "ngn") - Decimal("1")) < Decimal("0.000001")
+    assert get_usd_rate("XYZ") == Decimal("1")
+    assert convert_to_usd(Decimal("50"), "XYZ") == Decimal("50")
+
+
+def test_json_rate_direction():
+    # "1 USD = X currency" format
+    assert convert_to_usd(Decimal("1400"), "NGN", Decimal("1400")) == Decimal("1")
+    assert convert_to_usd(Decimal("85"), "EUR", Decimal("0.85")) == Decimal("100")
+    # "1 currency = Y USD" format
+    assert convert_to_usd(Decimal("1000"), "XAF", Decimal("0.00175")) == Decimal("1.75")
+
+
+def test_json_rate_rejected_when_out_of_band():
+    # 2.515 for XAF matches neither format, so the known rate is used
+    expected = convert_to_usd(Decimal("1000"), "XAF")
+    assert convert_to_usd(Decimal("1000"), "XAF", Decimal("2.515")) == expected
+
+
+def test_json_rate_for_unknown_currency():
+    assert convert_to_usd(Decimal("100"), "ZZZ", Decimal("50")) == Decimal("2")
+    assert convert_to_usd(Decimal("100"), "ZZZ", Decimal("2")) == Decimal("200")
+
+
+def test_usd_converter_matches_convert_to_usd():
+    cases = [
+        ("USD", None), (None, None), ("NGN", None), ("ngn", Decimal("1400")),
+        ("EUR", Decimal("0.85")), ("XAF", Decimal("0.00175")), ("XAF", Decimal("2.515")),
+        ("ZZZ", Decimal("50")), ("ZZZ", Decimal("2")), ("ZZZ", None),
+    ]
+    for code, rate in cases:
+        convert = usd_converter(code, rate)
+        for amount in (Decimal("1000"), Decimal("85.50"), Decimal("0"), None):
+            assert convert(amount) == convert_to_usd(amount, code, rate)
+
+
+def test_minor_unit_conversion():
+    assert convert_to_usd_cents(143361, "NGN") == 100
+    assert convert_to_usd_cents(12345, "usd") == 12345
+    assert convert_to_usd_cents(500, "XYZ") == 500
+    assert convert_to_usd_cents(0, "NGN") == 0
+    # Zero-decimal currencies are counted in whole units
+    assert convert_to_usd_cents(3458, "UGX") == 100
+    assert convert_to_usd_cents(571, "xaf") == 100
+
+
+def test_usd_rate_follows_rate_refresh():
+    from app.currency_rates import _DEFAULT_RATES, _store
+
+    _store.update({**_DEFAULT_RATES, "NGN": Decimal("1000")})
+    try:
+        assert get_usd_rate("ngn") == Decimal("0.001")
+    finally:
+        _store.update(_DEFAULT_RATES)
+    assert get_usd_rate("NGN") == 1 / _DEFAULT_RATES["NGN"]
@@ -0,0 +1,124 @@
+"""
+Tests for the dashboard response cache
+"""
+
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.response_cache import TTLCache, cached_response
+
+
+def test_value_reused_until_expired():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("pulse", compute) == 1
+    assert cache.get_or_compute("pulse", compute) == 1
+    assert cache.get_or_compute("live-view", compute) == 2
+
+    cache.ttl = 0
+    cache.clear()
+    assert cache.get_or_compute("pulse", compute) == 3
+    assert cache.get_or_compute("pulse", compute) == 4
+
+
+def test_cached_response_keeps_signature():
+    @cached_response(60)
+    def endpoint(db=None):
+        return object()
+
+    assert endpoint(db=1) is endpoint(db=2)
+    assert endpoint.__wrapped__.__name__ == "endpoint"
+    endpoint.cache.clear()
+
+
+def test_cached_response_keyed_by_query_parameters():
+    from app.response_cache import clear_response_caches
+
+    @cached_response(60)
+    def endpoint(start_date=None, interval=None, db=None):
+        return object()
+
+    first = endpoint(start_date="2025-01-01", interval=None, db=1)
+    assert endpoint(start_date="2025-01-01", interval=None, db=2) is first
+    assert endpoint(start_date="2025-02-01", interval=None, db=1) is not first
+
+    clear_response_caches()
+    assert endpoint(start_date="2025-01-01", interval=None, db=1) is not first
+
+
+def test_full_cache_drops_expired_entries():
+    cache = TTLCache(ttl=0, max_entries=2)
+    for key in range(5):
+        cache.get_or_compute(key, lambda: key)
+    assert len(cache._entries) <= 2
+
+
+def test_value_computed_across_clear_not_stored():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    def compute_during_sync():
+        calls.append(1)
+        cache.clear()   # the sync writes while this response is being computed
+        return len(calls)
+
+    assert cache.get_or_compute("trend", compute_during_sync) == 1
+    assert cache.get_or_compute("trend", lambda: "fresh") == "fresh"
+
+
+def test_failed_compute_releases_key_lock():
+    cache = TTLCache(ttl=60)
+
+    def invalid_range():
+        raise ValueError("bad date")
+
+    for key in range(10):
+        try:
+            cache.get_or_compute(key, invalid_range)
+        except ValueError:
+            pass
+    assert len(cache._entries) == 0
+    assert len(cache._key_locks) == 0
+
+    cache.get_or_compute("stored", lambda: 1)
+    cache.clear()
+    assert len(cache._key_locks) == 0
+
+
+def test_etag_middleware():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.response_cache import ETagMiddleware
+
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware, path_prefixes=("/api/analytics/",), max_age=5)
+
+    @app.get("/api/analytics/stats")
+    def stats():
+        return {"total": "1,234.50"}
+
+    @app.get("/api/other")
+    def other():
+        return {"total": 1}
+
+    client = TestClient(app)
+    response = client.get("/api/analytics/stats")
+    etag = response.headers["etag"]
+    assert response.json() == {"total": "1,234.50"}
+    assert response.headers["cache-control"] == "max-age=5"
+
+    not_modified = client.get("/api/analytics/stats", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    changed = client.get("/api/analytics/stats", headers={"If-None-Match": '"stale"'})
+    assert changed.status_code == 200
+    assert "etag" not in client.get("/api/other").headers
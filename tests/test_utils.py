@@ -0,0 +1,29 @@
+"""
+Tests for date range helpers
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import exclusive_end, get_date_range, parse_range_end
+
+
+def test_exclusive_end():
+    # A bare date covers the whole day
+    assert exclusive_end(datetime(2025, 1, 31)) == datetime(2025, 2, 1)
+    # Times cover their whole second
+    assert exclusive_end(datetime(2025, 1, 15, 14, 30)) == datetime(2025, 1, 15, 14, 30, 1)
+    assert exclusive_end(datetime(2025, 1, 15, 23, 59, 59)) == datetime(2025, 1, 16)
+
+    start, end = get_date_range("previous_day")
+    assert exclusive_end(end) == start + timedelta(days=1)
+
+
+def test_parse_range_end():
+    assert parse_range_end("2025-01-31") == datetime(2025, 1, 31, 23, 59, 59)
+    assert parse_range_end("2025-01-31 14:30:00") == datetime(2025, 1, 31, 14, 30)
+    assert parse_range_end("2025-01-31T14:30:00.000Z") == datetime(2025, 1, 31, 14, 30)